@@ -0,0 +1,184 @@
+# backend/analytics.py
+"""
+Analitik riwayat posisi dari export Parquet (export_parquet.py), tanpa menyentuh tabel positions.
+
+Per vehicle:
+  distance_km     : jumlah haversine_km antar titik berurutan
+  tracked_seconds : durasi antar titik, tidak termasuk gap > max_gap_seconds (data hilang)
+  avg_speed_kmh   : jarak / durasi interval yang terhitung di tracked_seconds (lompatan
+                    melewati gap ikut distance_km tapi tidak ikut rata-rata kecepatan)
+  avg_sog         : rata-rata kolom sog (satuan sama dengan producer)
+  time_in_status  : detik per status; interval dihitung ke status titik awalnya
+                    (status kosong -> turunan sog, sama dengan geofence.status_from_speed)
+
+File dibaca per (vehicle, hari) berurutan dan per batch, jadi memori tidak bergantung
+pada panjang window. Hari dipangkas lewat nama direktori (day=...) sebelum file dibuka.
+
+Contoh pakai:
+  python backend/analytics.py --root exports/positions --vehicle SHIP01 --from 2025-01-01 --to 2025-02-01
+"""
+import os
+import json
+import argparse
+from datetime import date, datetime, timedelta
+from urllib.parse import unquote
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from geo import haversine_km
+from geofence import status_from_speed
+from timeutil import parse_iso_local
+
+EXPORT_ROOT = os.getenv("EXPORT_ROOT", "exports/positions")
+ANALYTICS_MAX_GAP_SECONDS = float(os.getenv("ANALYTICS_MAX_GAP_SECONDS", "900"))
+READ_COLUMNS = ["lat", "lon", "sog", "status", "ts"]
+BATCH_ROWS = 65536
+
+
+def list_files(root, vehicle_ids=None, d_from=None, d_to=None):
+    """[(vehicle_id, day, path)] urut vehicle lalu hari; hanya hari yang export-nya selesai."""
+    wanted = set(vehicle_ids) if vehicle_ids else None
+    out = []
+    if not os.path.isdir(root):
+        return out
+    for day_name in os.listdir(root):
+        if not day_name.startswith("day="):
+            continue
+        try:
+            day = date.fromisoformat(day_name[4:])
+        except ValueError:
+            continue
+        if (d_from and day < d_from) or (d_to and day > d_to):
+            continue
+        day_path = os.path.join(root, day_name)
+        if not os.path.exists(os.path.join(day_path, "_SUCCESS")):
+            continue
+        for v_name in os.listdir(day_path):
+            if not v_name.startswith("vehicle_id="):
+                continue
+            vid = unquote(v_name[len("vehicle_id="):])
+            if wanted is not None and vid not in wanted:
+                continue
+            v_path = os.path.join(day_path, v_name)
+            for f in sorted(os.listdir(v_path)):
+                if f.endswith(".parquet"):
+                    out.append((vid, day, os.path.join(v_path, f)))
+    out.sort()
+    return out
+
+
+class VehicleStats:
+    __slots__ = ("vehicle_id", "points", "distance_km", "tracked_km", "tracked_us", "gap_us", "status_us",
+                 "sog_sum", "sog_n", "first_us", "last")
+
+    def __init__(self, vehicle_id):
+        self.vehicle_id = vehicle_id
+        self.points = 0
+        self.distance_km = 0.0
+        self.tracked_km = 0.0
+        self.tracked_us = 0
+        self.gap_us = 0
+        self.status_us = {}
+        self.sog_sum = 0.0
+        self.sog_n = 0
+        self.first_us = None
+        self.last = None   # (lat, lon, status, ts_us) titik sebelumnya
+
+    def add(self, lat, lon, sog, status, ts_us, max_gap_us):
+        if sog is not None:
+            self.sog_sum += sog
+            self.sog_n += 1
+            if status is None:
+                status = status_from_speed(sog)
+        prev = self.last
+        if prev is None:
+            self.first_us = ts_us
+        else:
+            dt = ts_us - prev[3]
+            d_km = 0.0
+            if lat is not None and lon is not None and prev[0] is not None and prev[1] is not None:
+                d_km = haversine_km(prev[0], prev[1], lat, lon)
+                self.distance_km += d_km
+            if dt > max_gap_us:
+                self.gap_us += dt
+            elif dt > 0:
+                self.tracked_km += d_km
+                self.tracked_us += dt
+                if prev[2] is not None:
+                    self.status_us[prev[2]] = self.status_us.get(prev[2], 0) + dt
+        self.last = (lat, lon, status, ts_us)
+        self.points += 1
+
+    def to_dict(self):
+        tracked = self.tracked_us / 1e6
+        return {
+            "vehicle_id": self.vehicle_id,
+            "points": self.points,
+            "first_ts": _us_to_iso(self.first_us),
+            "last_ts": _us_to_iso(self.last[3] if self.last else None),
+            "distance_km": round(self.distance_km, 3),
+            "tracked_seconds": round(tracked, 1),
+            "gap_seconds": round(self.gap_us / 1e6, 1),
+            "avg_speed_kmh": round(self.tracked_km / (tracked / 3600.0), 3) if tracked > 0 else None,
+            "avg_sog": round(self.sog_sum / self.sog_n, 3) if self.sog_n else None,
+            "time_in_status": {k: round(v / 1e6, 1) for k, v in sorted(self.status_us.items())},
+        }
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _us_to_iso(us):
+    return (_EPOCH + timedelta(microseconds=us)).isoformat() if us is not None else None
+
+
+def _to_us(ts):
+    return (ts - _EPOCH) // timedelta(microseconds=1) if ts is not None else None
+
+
+def vehicle_summaries(root=EXPORT_ROOT, vehicle_ids=None, t_from=None, t_to=None,
+                      max_gap_seconds=ANALYTICS_MAX_GAP_SECONDS):
+    """
+    Ringkasan per vehicle dari export di root, window [t_from, t_to) (datetime naive, sama
+    dengan kolom ts). Return list dict (lihat VehicleStats.to_dict), urut vehicle_id.
+    """
+    lo_us, hi_us = _to_us(t_from), _to_us(t_to)
+    d_to = (t_to - timedelta(microseconds=1)).date() if t_to else None
+    max_gap_us = int(max_gap_seconds * 1e6)
+    out = []
+    stats = None
+    for vid, _day, path in list_files(root, vehicle_ids, t_from.date() if t_from else None, d_to):
+        if stats is None or stats.vehicle_id != vid:
+            if stats is not None and stats.points:
+                out.append(stats.to_dict())
+            stats = VehicleStats(vid)
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_ROWS, columns=READ_COLUMNS):
+            ts = batch.column("ts").cast(pa.int64()).to_pylist()
+            cols = zip(batch.column("lat").to_pylist(), batch.column("lon").to_pylist(),
+                       batch.column("sog").to_pylist(), batch.column("status").to_pylist(), ts)
+            for lat, lon, sog, status, ts_us in cols:
+                if (lo_us is not None and ts_us < lo_us) or (hi_us is not None and ts_us >= hi_us):
+                    continue
+                stats.add(lat, lon, sog, status, ts_us, max_gap_us)
+    if stats is not None and stats.points:
+        out.append(stats.to_dict())
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description="Jarak, kecepatan rata-rata & waktu per status dari export Parquet")
+    p.add_argument("--root", default=EXPORT_ROOT, help="direktori export (default: env EXPORT_ROOT)")
+    p.add_argument("--vehicle", action="append", default=None, help="filter vehicle (boleh berulang)")
+    p.add_argument("--from", dest="t_from", type=parse_iso_local, default=None, help="awal window (ISO)")
+    p.add_argument("--to", dest="t_to", type=parse_iso_local, default=None, help="akhir window (ISO, eksklusif)")
+    p.add_argument("--max-gap", type=float, default=ANALYTICS_MAX_GAP_SECONDS,
+                   help="detik; interval lebih panjang dianggap data hilang")
+    args = p.parse_args()
+
+    rows = vehicle_summaries(args.root, args.vehicle, args.t_from, args.t_to, args.max_gap)
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
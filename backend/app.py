@@ -1,7 +1,85 @@
+# backend/app.py
+"""
+Entry point tunggal API: create_app() merakit FastAPI dari router yang dipilih.
+
+- APP_BACKEND : db (default, Postgres) | mock (data statis) | memory (in-process, lihat app_memory.py) | none
+- APP_WEATHER : 1 (default) / 0 -> router cuaca (/get_full_weather_data, app_sea.py)
+- APP_ANALYTICS : 1 / 0 (default) -> /analytics/* dari export Parquet (app_analytics.py, butuh pyarrow)
+
+Modul router baru di-import saat diaktifkan, jadi engine DB, httpx dan cache cuaca
+tidak dibuat kalau router-nya mati (cold start lebih cepat, memori worker lebih kecil).
+Ukur dengan benchmarks/bench_startup.py.
+
+Contoh pakai:
+  uvicorn app:app
+  APP_BACKEND=mock APP_WEATHER=0 uvicorn app:app
+"""
+import os
+import logging
+import importlib
+
 from fastapi import FastAPI
-from app_sea import router as sea_router  # Pastikan impor router dari app_sea.py
+from fastapi.middleware.cors import CORSMiddleware
+
+import metrics
+
+# backend -> modul router
+BACKENDS = {"db": "app_db", "mock": "app_mock", "memory": "app_memory", "none": None}
+TITLES = {
+    "db": "Realtime Tracking API (with DB)",
+    "mock": "Realtime Tracking API (MOCK)",
+    "memory": "Realtime Tracking API (in-memory)",
+    "none": "Realtime Tracking API",
+}
+
+
+def _load_dotenv():
+    """Muat .env (kalau python-dotenv ada) sebelum konfigurasi dibaca."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
+
+def create_app(backend=None, weather=None, analytics=None):
+    """Rakit app: backend (db | mock | memory | none) + router cuaca / analitik opsional. Default dari env."""
+    _load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    backend = backend or os.getenv("APP_BACKEND", "db")
+    if backend not in BACKENDS:
+        raise ValueError(f"APP_BACKEND tidak dikenal: {backend!r} (pilihan: {', '.join(BACKENDS)})")
+    if weather is None:
+        weather = os.getenv("APP_WEATHER", "1") == "1"
+    if analytics is None:
+        analytics = os.getenv("APP_ANALYTICS", "0") == "1"
+
+    app = FastAPI(title=TITLES[backend])
+    # CORS (bebas di-dev; boleh dipersempit saat prod)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # GET /metrics (Prometheus) + profiling per request yang bisa di-toggle (lihat metrics.py)
+    metrics.setup(app)
+
+    if BACKENDS[backend]:
+        app.include_router(importlib.import_module(BACKENDS[backend]).router)
+    if weather:
+        from app_sea import router as sea_router
+        app.include_router(sea_router)
+    if analytics:
+        from app_analytics import router as analytics_router
+        app.include_router(analytics_router)
+    return app
 
-app = FastAPI()
 
-# Daftarkan router untuk data cuaca dan laut
-app.include_router(sea_router)
+def __getattr__(name):
+    # `uvicorn app:app`: app dirakit saat pertama diakses, jadi `import app` saja tetap murah
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,66 @@
+# backend/app_analytics.py
+"""
+Router analitik (APP_ANALYTICS=1): ringkasan riwayat per vehicle dibaca dari export
+Parquet (export_parquet.py / analytics.py), bukan dari tabel positions.
+
+- GET /analytics/vehicles               : semua / beberapa vehicle (vehicle_id berulang)
+- GET /analytics/vehicles/{vehicle_id}  : satu vehicle
+
+Hanya hari yang sudah diekspor yang terhitung (biasanya s/d kemarin). Butuh pyarrow.
+"""
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from analytics import ANALYTICS_MAX_GAP_SECONDS, EXPORT_ROOT, vehicle_summaries
+from timeutil import to_local_naive
+
+router = APIRouter()
+
+
+async def _summaries(vehicle_ids, t_from, t_to, max_gap):
+    # export menyimpan ts apa adanya dari positions (lokal naive, lihat timeutil.py)
+    t_from, t_to = to_local_naive(t_from), to_local_naive(t_to)
+    if t_from and t_to and t_from >= t_to:
+        raise HTTPException(status_code=400, detail="'from' harus lebih awal dari 'to'")
+    # baca file + loop per titik: jangan blok event loop
+    return await run_in_threadpool(vehicle_summaries, EXPORT_ROOT, vehicle_ids, t_from, t_to, max_gap)
+
+
+@router.get("/analytics/vehicles")
+async def analytics_vehicles(
+    vehicle_id: Optional[List[str]] = Query(None, description="Filter vehicle (boleh berulang); default semua"),
+    t_from: Optional[datetime] = Query(None, alias="from", description="Awal window (ISO)"),
+    t_to: Optional[datetime] = Query(None, alias="to", description="Akhir window (ISO, eksklusif)"),
+    max_gap: float = Query(ANALYTICS_MAX_GAP_SECONDS, gt=0, description="Detik; interval lebih panjang = data hilang"),
+):
+    try:
+        rows = await _summaries(vehicle_id, t_from, t_to, max_gap)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.exception("analytics failed")
+        return {"error": str(e)}
+    return {"count": len(rows), "data": rows}
+
+
+@router.get("/analytics/vehicles/{vehicle_id}")
+async def analytics_vehicle(
+    vehicle_id: str,
+    t_from: Optional[datetime] = Query(None, alias="from", description="Awal window (ISO)"),
+    t_to: Optional[datetime] = Query(None, alias="to", description="Akhir window (ISO, eksklusif)"),
+    max_gap: float = Query(ANALYTICS_MAX_GAP_SECONDS, gt=0, description="Detik; interval lebih panjang = data hilang"),
+):
+    try:
+        rows = await _summaries([vehicle_id], t_from, t_to, max_gap)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.exception("analytics failed")
+        return {"error": str(e)}
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"tidak ada data export untuk {vehicle_id}")
+    return rows[0]
@@ -0,0 +1,142 @@
+# backend/app_memory.py
+"""
+Router backend in-memory (APP_BACKEND=memory): tanpa Postgres, posisi disimpan di
+proses sendiri. Cocok untuk demo frontend, test lokal, dan benchmark jalur API
+tanpa DB.
+
+- POST /positions      : terima batch titik (JSON array), update posisi terakhir + track
+- GET  /vehicles, /positions/latest, /positions/within, /positions/near : sama dengan backend db
+       (termasuk ?at=now, dead reckoning)
+- GET  /vehicles/{id}/track : maks MEMORY_TRACK_POINTS titik terakhir per vehicle
+
+Data hilang saat proses berhenti, dan tiap worker uvicorn punya isi sendiri.
+"""
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import BaseModel
+
+from dead_reckoning import parse_at
+from latest_store import LatestStore
+from position_bus import parse_bbox
+from serialize import (AT_QUERY, FORMAT_QUERY, LATEST_FIELDS, NEAR_FIELDS, PREDICTED_FIELDS,
+                       PREDICTED_NEAR_FIELDS, rows_response)
+from timeutil import to_local_naive
+
+router = APIRouter()
+
+MEMORY_TRACK_POINTS = int(os.getenv("MEMORY_TRACK_POINTS", "1000"))
+NEAR_MAX_RADIUS_KM = float(os.getenv("NEAR_MAX_RADIUS_KM", "5000"))
+TRACK_FIELDS = ("lat", "lon", "sog", "cog", "heading", "status", "ts")
+
+latest_store = LatestStore(index_cell_deg=float(os.getenv("SPATIAL_CELL_DEG", "0.5")))
+_tracks = {}   # vehicle_id -> deque titik terakhir
+# Handler sync jalan di threadpool: append (POST) dan iterasi (GET track) harus di bawah lock,
+# kalau tidak iterasi bisa gagal dengan "deque mutated during iteration"
+_tracks_lock = threading.Lock()
+
+
+class PositionIn(BaseModel):
+    vehicle_id: str
+    lat: float
+    lon: float
+    sog: Optional[float] = None
+    cog: Optional[float] = None
+    heading: Optional[float] = None
+    status: Optional[str] = None
+    ts: Optional[datetime] = None
+
+
+def _local_naive(ts):
+    """Samakan dengan producer (lihat timeutil.py) supaya ts bisa dibandingkan; None -> sekarang."""
+    return datetime.now() if ts is None else to_local_naive(ts)
+
+
+@router.get("/health")
+def health():
+    return {"status": "ok", "backend": "memory", "vehicles": len(_tracks)}
+
+
+@router.post("/positions")
+def ingest_positions(points: List[PositionIn]):
+    """Terima batch titik; yang lebih tua dari posisi terakhir tetap masuk track tapi tidak mengubah latest."""
+    rows = []
+    for p in points:
+        row = p.dict()
+        row["ts"] = _local_naive(p.ts)
+        rows.append(row)
+    with _tracks_lock:
+        for row in rows:
+            track = _tracks.get(row["vehicle_id"])
+            if track is None:
+                track = _tracks[row["vehicle_id"]] = deque(maxlen=MEMORY_TRACK_POINTS)
+            track.append({k: row[k] for k in TRACK_FIELDS})
+    changed = latest_store.apply_many(rows)
+    return {"accepted": len(rows), "changed": len(changed)}
+
+
+def _parse_at(value):
+    """?at= -> datetime (atau None); 400 kalau format salah."""
+    try:
+        return parse_at(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/vehicles")
+def get_vehicles(request: Request, fmt: str = FORMAT_QUERY, at: Optional[str] = AT_QUERY):
+    return rows_response(request, latest_store.vehicles(_parse_at(at)), fmt=fmt)
+
+
+@router.get("/positions/latest")
+def latest_positions(request: Request, fmt: str = FORMAT_QUERY, at: Optional[str] = AT_QUERY):
+    at = _parse_at(at)
+    return rows_response(request, latest_store.positions(at), PREDICTED_FIELDS if at else LATEST_FIELDS, fmt)
+
+
+@router.get("/positions/within")
+def positions_within(
+    request: Request,
+    bbox: str = Query(..., description="minLon,minLat,maxLon,maxLat"),
+    fmt: str = FORMAT_QUERY,
+    at: Optional[str] = AT_QUERY,
+):
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    at = _parse_at(at)
+    return rows_response(request, latest_store.within(box, at), PREDICTED_FIELDS if at else LATEST_FIELDS, fmt)
+
+
+@router.get("/positions/near")
+def positions_near(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(..., gt=0, le=NEAR_MAX_RADIUS_KM),
+    limit: Optional[int] = Query(None, ge=1, description="Maks vehicle terdekat"),
+    fmt: str = FORMAT_QUERY,
+    at: Optional[str] = AT_QUERY,
+):
+    at = _parse_at(at)
+    fields = PREDICTED_FIELDS if at else LATEST_FIELDS
+    out = []
+    for dist, p in latest_store.near(lat, lon, radius_km, limit, at):
+        d = {k: p[k] for k in fields}
+        d["distance_km"] = round(dist, 3)
+        out.append(d)
+    return rows_response(request, out, PREDICTED_NEAR_FIELDS if at else NEAR_FIELDS, fmt)
+
+
+@router.get("/vehicles/{vehicle_id}/track")
+def get_track(vehicle_id: str, limit: int = Query(1000, ge=1)):
+    """Titik terakhir vehicle (urut waktu naik), maksimal limit; tanpa window / simplify."""
+    with _tracks_lock:
+        points = list(_tracks.get(vehicle_id, ()))
+    points = sorted(points, key=lambda p: p["ts"])[-limit:]
+    return {"vehicle_id": vehicle_id, "simplify": "none", "next_cursor": None, "points": points}
@@ -1,18 +1,19 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+# backend/app_mock.py
+"""Router backend mock (data statis, tanpa DB). Dirakit oleh app.create_app() (APP_BACKEND=mock)."""
+from fastapi import APIRouter
 from datetime import datetime, timedelta, timezone
 
-app = FastAPI(title="Realtime Tracking API (MOCK)")
+router = APIRouter()
+
+
+def __getattr__(name):
+    # kompatibilitas `uvicorn app_mock:app`
+    if name == "app":
+        from app import create_app
+        globals()["app"] = create_app(backend="mock", weather=False)
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Allow all origins (biar frontend bisa fetch API tanpa cors error)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
 # Data mock kendaraan
 VEHICLES = {
@@ -82,7 +83,7 @@ TRACKS = {
 
 # ==== API ENDPOINTS ====
 
-@app.get("/vehicles")
+@router.get("/vehicles")
 def get_vehicles():
     """List semua kendaraan dengan posisi terakhir"""
     result = []
@@ -94,7 +95,7 @@ def get_vehicles():
         })
     return result
 
-@app.get("/vehicles/{vehicle_id}")
+@router.get("/vehicles/{vehicle_id}")
 def get_vehicle(vehicle_id: str):
     """Detail satu kendaraan"""
     if vehicle_id in VEHICLES:
@@ -1,25 +1,99 @@
-import requests
+import asyncio
+import httpx
 from fastapi import APIRouter, HTTPException, Query
 from datetime import datetime
 from dotenv import load_dotenv
 import os
-import numpy as np
+import logging
+from time import perf_counter
 
-# Muat variabel lingkungan dari file .env
+from metrics import WEATHER_UPSTREAM, WEATHER_UPSTREAM_ERRORS, register_callback
+from weather_cache import cache_from_env
+
+# Muat variabel lingkungan dari file .env (no-op kalau app.create_app() sudah memuatnya)
 load_dotenv()
 
 # Ambil kredensial dari .env
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 STORMGLASS_API_KEY = os.getenv("STORMGLASS_API_KEY")
 
+# Endpoint upstream (bisa diarahkan ke stub server lokal, lihat benchmarks/stub_weather.py)
+OPENWEATHER_URL = os.getenv("OPENWEATHER_URL", "http://api.openweathermap.org/data/2.5/weather")
+STORMGLASS_URL = os.getenv("STORMGLASS_URL", "https://api.stormglass.io/v2/weather/point")
+
+# Timeout (detik) & ukuran pool koneksi HTTP ke upstream
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", "10"))
+WEATHER_CONNECT_TIMEOUT = float(os.getenv("WEATHER_CONNECT_TIMEOUT", "3"))
+WEATHER_MAX_CONNECTIONS = int(os.getenv("WEATHER_MAX_CONNECTIONS", "100"))
+
 # Inisialisasi APIRouter
 router = APIRouter()
 
+# ===== Cache cuaca per sel grid + jam =====
+# WEATHER_GRID_DEG, WEATHER_CACHE_TTL, WEATHER_CACHE_MAX_ENTRIES,
+# WEATHER_CACHE_BACKEND (memory | sqlite), WEATHER_CACHE_PATH
+weather_cache = cache_from_env(os.environ)
+register_callback("weather_cache", "cache", lambda: {"weather": weather_cache.stats()}, "Cache cuaca")
+
+# ===== HTTP client async (dipakai bersama, koneksi di-pool) =====
+# Log request httpx memuat URL lengkap (termasuk appid); jangan tampilkan di level INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
+_http_client = None
+
+
+def get_http_client():
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(WEATHER_TIMEOUT, connect=WEATHER_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=WEATHER_MAX_CONNECTIONS,
+                max_keepalive_connections=WEATHER_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def _upstream_get(upstream, url, **kwargs):
+    """GET ke upstream cuaca lewat client bersama + metrik latency / error."""
+    t0 = perf_counter()
+    outcome = "error"
+    try:
+        response = await get_http_client().get(url, **kwargs)
+    except httpx.TimeoutException:
+        WEATHER_UPSTREAM_ERRORS.labels(upstream, "timeout").inc()
+        raise
+    except httpx.TransportError:
+        WEATHER_UPSTREAM_ERRORS.labels(upstream, "transport").inc()
+        raise
+    else:
+        if response.is_error:
+            WEATHER_UPSTREAM_ERRORS.labels(upstream, f"http_{response.status_code}").inc()
+            # jangan pakai raise_for_status(): pesannya memuat URL lengkap (termasuk API key)
+            raise RuntimeError(f"HTTP {response.status_code}")
+        outcome = "ok"
+        return response
+    finally:
+        WEATHER_UPSTREAM.labels(upstream, outcome).observe(perf_counter() - t0)
+
+
+@router.on_event("shutdown")
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 # Function untuk mengambil data cuaca dari OpenWeather API
-def get_weather_data(lat: float, lon: float):
+async def get_weather_data(lat: float, lon: float):
     try:
-        url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={OPENWEATHER_API_KEY}&units=metric"
-        response = requests.get(url)
+        params = {
+            "lat": lat,
+            "lon": lon,
+            "appid": OPENWEATHER_API_KEY,
+            "units": "metric"
+        }
+        response = await _upstream_get("openweather", OPENWEATHER_URL, params=params)
         data = response.json()
 
         # Ambil suhu udara (temp)
@@ -42,9 +116,8 @@ def get_weather_data(lat: float, lon: float):
         raise HTTPException(status_code=500, detail=f"Error fetching weather data: {e}")
 
 # Function untuk mengambil data cuaca laut dari StormGlass API
-def get_ocean_weather_data(lat: float, lon: float, time: str):
+async def get_ocean_weather_data(lat: float, lon: float, time: str):
     try:
-        url = f"https://api.stormglass.io/v2/weather/point"
         params = {
             "lat": lat,
             "lng": lon,
@@ -55,7 +128,7 @@ def get_ocean_weather_data(lat: float, lon: float, time: str):
         headers = {
             "Authorization": STORMGLASS_API_KEY
         }
-        response = requests.get(url, params=params, headers=headers)
+        response = await _upstream_get("stormglass", STORMGLASS_URL, params=params, headers=headers)
         data = response.json()
 
         # Ambil data dari Stormglass
@@ -75,6 +148,33 @@ def get_ocean_weather_data(lat: float, lon: float, time: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching ocean weather data: {e}")
 
+async def fetch_full_weather(lat: float, lon: float, time: str):
+    """Panggil OpenWeather & StormGlass bersamaan untuk satu titik/waktu."""
+    # Dua upstream dipanggil bersamaan: latency = max(OpenWeather, StormGlass)
+    weather, ocean_weather = await asyncio.gather(
+        get_weather_data(lat, lon),
+        get_ocean_weather_data(lat, lon, time),
+        return_exceptions=True,
+    )
+    for result in (weather, ocean_weather):
+        if isinstance(result, BaseException):
+            raise result
+
+    return {
+        "weather": weather,
+        "ocean_weather": ocean_weather
+    }
+
+
+async def get_cell_weather(lat: float, lon: float, time: str):
+    """Data cuaca untuk sel grid yang memuat (lat, lon, time), lewat cache."""
+    try:
+        cell = weather_cache.cell(lat, lon, time)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid time (expected ISO format): {time}")
+    return await weather_cache.get_or_fetch(cell, fetch_full_weather)
+
+
 # Daftarkan endpoint API
 @router.get("/get_full_weather_data")
 async def get_full_weather_data(
@@ -82,10 +182,11 @@ async def get_full_weather_data(
     lon: float = Query(..., description="Longitude of the location"),
     time: str = Query(..., description="Time in ISO format (e.g., '2025-08-25T00:00:00')")
 ):
-    weather = get_weather_data(lat, lon)
-    ocean_weather = get_ocean_weather_data(lat, lon, time)
-    
-    return {
-        "weather": weather,
-        "ocean_weather": ocean_weather
-    }
+    # Lokasi di-snap ke grid & waktu dibulatkan ke jam (lihat weather_cache.py)
+    return await get_cell_weather(lat, lon, time)
+
+
+@router.get("/weather/cache/stats")
+def weather_cache_stats():
+    """Counter hit/miss cache cuaca."""
+    return weather_cache.stats()
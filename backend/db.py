@@ -0,0 +1,87 @@
+# backend/db.py
+"""
+Engine database dengan pool yang bisa di-tune lewat env.
+
+- DB_POOL_SIZE    : koneksi tetap di pool (default 5)
+- DB_MAX_OVERFLOW : koneksi tambahan di atas pool saat ramai (default 10)
+- DB_POOL_TIMEOUT : detik menunggu koneksi bebas sebelum error (default 30)
+- DB_POOL_RECYCLE : umur maksimum koneksi (detik), -1 = tanpa batas (default 1800)
+
+Jalur async (SQLAlchemy asyncio + asyncpg) dipakai endpoint yang paling sering
+dipanggil, jadi tidak memakan slot threadpool selama menunggu DB. asyncpg
+menyimpan prepared statement per koneksi, jadi query yang sama cukup di-parse
+/ plan sekali per koneksi. Engine sync (psycopg2) tetap dipakai endpoint lain.
+"""
+from contextlib import asynccontextmanager
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def pool_settings(env):
+    """Argumen pool untuk create_engine / create_async_engine dari env (dict-like)."""
+    return {
+        "pool_size": int(env.get("DB_POOL_SIZE", "5")),
+        "max_overflow": int(env.get("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(env.get("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(env.get("DB_POOL_RECYCLE", "1800")),
+    }
+
+
+def async_url(url):
+    """postgresql://... atau postgresql+psycopg2://... -> postgresql+asyncpg://..."""
+    scheme, sep, rest = url.partition("://")
+    if scheme.split("+")[0] in ("postgres", "postgresql"):
+        scheme = "postgresql+asyncpg"
+    return scheme + sep + rest
+
+
+def pool_stats(pool):
+    """Snapshot QueuePool: ukuran, koneksi dipakai / idle, overflow yang sedang terpakai."""
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),  # negatif = pool belum penuh
+    }
+
+
+class AsyncDB:
+    """AsyncEngine + counter antrean koneksi (waiting) untuk metrik pool."""
+
+    def __init__(self, url, **pool_kw):
+        self.engine = create_async_engine(async_url(url), pool_pre_ping=True, **pool_kw)
+        self.waiting = 0        # coroutine yang sedang menunggu koneksi
+        self.max_waiting = 0
+        self.timeouts = 0       # checkout yang gagal karena DB_POOL_TIMEOUT
+
+    @asynccontextmanager
+    async def begin(self):
+        """Ambil koneksi dari pool lalu buka transaksi (commit otomatis saat keluar)."""
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            conn = await self.engine.connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+        try:
+            async with conn.begin():
+                yield conn
+        finally:
+            await conn.close()
+
+    async def ping(self):
+        """Query termurah untuk cek DB bisa dijangkau."""
+        async with self.begin() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def stats(self):
+        out = pool_stats(self.engine.sync_engine.pool)
+        out.update(waiting=self.waiting, max_waiting=self.max_waiting, timeouts=self.timeouts)
+        return out
+
+    async def dispose(self):
+        await self.engine.dispose()
@@ -0,0 +1,79 @@
+# backend/dead_reckoning.py
+"""
+Dead reckoning: perkiraan posisi vehicle saat `at` dari fix terakhirnya (sog + cog).
+
+Titik diproyeksikan sepanjang great-circle (geo.destination_point) sejauh
+sog (km/h, sama dengan producer) x umur fix. Tidak diproyeksikan (fix dikembalikan
+apa adanya, predicted = false) kalau:
+- fix lebih tua dari DR_MAX_AGE_SECONDS (vehicle dianggap stale, jangan ditebak jauh)
+- sog < DR_MIN_SOG (Stopped), atau sog / cog (fallback heading) kosong
+- fix lebih baru dari `at`
+sog dibatasi DR_MAX_SOG_KMH, jadi pergeseran maksimum diketahui (max_shift_km) dan
+query spasial cukup memperlebar area cari sebesar itu.
+
+Dipakai LatestStore untuk ?at= di /vehicles dan /positions/latest|within|near.
+"""
+import os
+import math
+from datetime import datetime
+
+from geo import R_KM, destination_point
+from timeutil import parse_iso_local
+
+DR_MAX_AGE_SECONDS = float(os.getenv("DR_MAX_AGE_SECONDS", "120"))
+DR_MIN_SOG = float(os.getenv("DR_MIN_SOG", "1.0"))
+DR_MAX_SOG_KMH = float(os.getenv("DR_MAX_SOG_KMH", "150"))
+
+
+def parse_at(value):
+    """'now' / ISO 8601 -> datetime lokal naive (sama dengan kolom ts). None -> None. ValueError kalau salah."""
+    if value is None or value == "":
+        return None
+    if value == "now":
+        return datetime.now()
+    try:
+        return parse_iso_local(value)
+    except ValueError:
+        raise ValueError("at harus 'now' atau waktu ISO 8601")
+
+
+def max_shift_km(max_age=DR_MAX_AGE_SECONDS):
+    return DR_MAX_SOG_KMH * max_age / 3600.0
+
+
+def expand_bbox(bbox, km):
+    """Perlebar bbox (minLon, minLat, maxLon, maxLat) sejauh km ke semua arah."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    dlat = math.degrees(km / R_KM)
+    min_lat, max_lat = max(-90.0, min_lat - dlat), min(90.0, max_lat + dlat)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6:
+        return -180.0, min_lat, 180.0, max_lat
+    dlon = dlat / cos_lat
+    return max(-180.0, min_lon - dlon), min_lat, min(180.0, max_lon + dlon), max_lat
+
+
+def predict(p, at, max_age=DR_MAX_AGE_SECONDS):
+    """
+    Dict baru dari posisi p untuk waktu at: lat/lon/ts diganti hasil proyeksi kalau
+    bisa diproyeksikan. Selalu ditambah fix_ts (ts fix asli) dan predicted (bool).
+    """
+    out = dict(p)
+    ts = p.get("ts")
+    out["fix_ts"] = ts
+    out["predicted"] = False
+    lat, lon, sog = p.get("lat"), p.get("lon"), p.get("sog")
+    if ts is None or lat is None or lon is None or sog is None or sog < DR_MIN_SOG:
+        return out
+    course = p.get("cog")
+    if course is None:
+        course = p.get("heading")
+    if course is None:
+        return out
+    age = (at - ts).total_seconds()
+    if age <= 0 or age > max_age:
+        return out
+    out["lat"], out["lon"] = destination_point(lat, lon, course, min(sog, DR_MAX_SOG_KMH) * age / 3600.0)
+    out["ts"] = at
+    out["predicted"] = True
+    return out
@@ -0,0 +1,127 @@
+# backend/geo.py
+"""
+Util geospasial untuk query posisi: jarak haversine, titik tujuan great-circle
+(dead reckoning) dan index grid in-memory.
+
+GridIndex membagi bumi ke sel lat/lon berukuran tetap (cell_deg). Query bbox /
+radius hanya memeriksa sel yang bersinggungan, jadi biayanya sebanding dengan
+jumlah vehicle di sekitar area query, bukan ukuran fleet.
+"""
+import math
+from collections import defaultdict
+
+# Sama dengan simulators/producer_ship.py supaya jarak konsisten end-to-end
+R_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2)**2
+    return 2*R_KM*math.asin(math.sqrt(min(1.0, a)))
+
+
+def destination_point(lat, lon, brng, dist_km):
+    """Titik sejauh dist_km dari (lat, lon) dengan bearing awal brng (great-circle, sama dengan producer)."""
+    d = dist_km / R_KM
+    phi1, lam1, theta = math.radians(lat), math.radians(lon), math.radians(brng)
+    phi2 = math.asin(math.sin(phi1)*math.cos(d) + math.cos(phi1)*math.sin(d)*math.cos(theta))
+    lam2 = lam1 + math.atan2(math.sin(theta)*math.sin(d)*math.cos(phi1),
+                             math.cos(d) - math.sin(phi1)*math.sin(phi2))
+    return math.degrees(phi2), (math.degrees(lam2) + 540) % 360 - 180
+
+
+def bbox_around(lat, lon, radius_km):
+    """
+    Bbox (minLon, minLat, maxLon, maxLat) yang memuat seluruh lingkaran radius_km.
+    Kalau lingkaran menyentuh kutub atau melewati antimeridian, rentang lon dibuka penuh.
+    """
+    d = radius_km / R_KM
+    dlat = math.degrees(d)
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90 or d >= math.pi / 2:
+        return -180.0, max(-90.0, min_lat), 180.0, min(90.0, max_lat)
+    dlon = math.degrees(math.asin(min(1.0, math.sin(d) / math.cos(math.radians(lat)))))
+    if lon - dlon < -180 or lon + dlon > 180:
+        return -180.0, min_lat, 180.0, max_lat
+    return lon - dlon, min_lat, lon + dlon, max_lat
+
+
+class GridIndex:
+    """Index titik (key -> lat/lon) per sel grid. Tidak thread-safe; pemanggil yang mengunci."""
+
+    def __init__(self, cell_deg=0.5):
+        self.cell_deg = cell_deg
+        self._cells = defaultdict(set)  # (ix, iy) -> set key
+        self._points = {}               # key -> (lat, lon, (ix, iy))
+
+    def __len__(self):
+        return len(self._points)
+
+    def _cell(self, lat, lon):
+        return math.floor(lon / self.cell_deg), math.floor(lat / self.cell_deg)
+
+    def update(self, key, lat, lon):
+        """Pasang / pindahkan titik. lat/lon None -> titik dibuang dari index."""
+        if lat is None or lon is None:
+            self.remove(key)
+            return
+        cell = self._cell(lat, lon)
+        old = self._points.get(key)
+        if old is not None and old[2] != cell:
+            self._discard(key, old[2])
+        self._cells[cell].add(key)
+        self._points[key] = (lat, lon, cell)
+
+    def remove(self, key):
+        old = self._points.pop(key, None)
+        if old is not None:
+            self._discard(key, old[2])
+
+    def _discard(self, key, cell):
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._points.clear()
+
+    def _candidates(self, min_lon, min_lat, max_lon, max_lat):
+        x0, y0 = self._cell(min_lat, min_lon)
+        x1, y1 = self._cell(max_lat, max_lon)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            # area query lebih luas dari sel yang terisi: lebih murah scan sel yang ada
+            for (x, y), keys in self._cells.items():
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    yield from keys
+            return
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                keys = self._cells.get((x, y))
+                if keys:
+                    yield from keys
+
+    def within(self, min_lon, min_lat, max_lon, max_lat):
+        """Key yang titiknya di dalam bbox (batas inklusif)."""
+        out = []
+        for key in self._candidates(min_lon, min_lat, max_lon, max_lat):
+            lat, lon, _ = self._points[key]
+            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon:
+                out.append(key)
+        return out
+
+    def near(self, lat, lon, radius_km):
+        """List (jarak_km, key) dalam radius_km dari (lat, lon), urut jarak terdekat."""
+        out = []
+        for key in self._candidates(*bbox_around(lat, lon, radius_km)):
+            plat, plon, _ = self._points[key]
+            d = haversine_km(lat, lon, plat, plon)
+            if d <= radius_km:
+                out.append((d, key))
+        out.sort()
+        return out
@@ -0,0 +1,254 @@
+# backend/geofence.py
+"""
+Engine geofence + transisi status, dievaluasi incremental per posisi baru.
+
+- Fence: polygon (ring [[lon, lat], ...]) atau lingkaran (center + radius_km),
+  opsional dwell_seconds.
+- FenceIndex: bbox tiap fence didaftarkan ke sel grid yang dilaluinya, jadi satu
+  posisi hanya dicek ke fence di sel yang sama (biaya ~ jumlah fence di sekitar,
+  bukan total fence).
+- GeofenceEngine.evaluate(pos) -> list event:
+    enter / exit   : vehicle masuk / keluar fence
+    dwell          : sudah di dalam fence >= dwell_seconds (sekali per kunjungan)
+    status_change  : status turunan sog berubah (Moving / Idle / Stopped)
+  Posisi yang lebih tua dari posisi terakhir vehicle diabaikan. Posisi pertama
+  vehicle menghasilkan enter untuk fence yang sedang dimasuki.
+
+Engine tidak menyentuh DB; penyimpanan state & event ada di geofence_worker.py.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime
+
+from geo import bbox_around, haversine_km
+
+EVENT_TYPES = ("enter", "exit", "dwell", "status_change")
+
+
+def status_from_speed(sog):
+    """Sama dengan simulators/producer_ship.py: < 1 Stopped, < 5 Idle, selain itu Moving."""
+    if sog < 1:
+        return "Stopped"
+    elif sog < 5:
+        return "Idle"
+    else:
+        return "Moving"
+
+
+def _point_in_ring(lat, lon, ring):
+    """Ray casting; ring = list (lon, lat), boleh tidak ditutup."""
+    inside = False
+    n = len(ring)
+    x0, y0 = ring[-1]
+    for i in range(n):
+        x1, y1 = ring[i]
+        if (y1 > lat) != (y0 > lat) and lon < (x0 - x1) * (lat - y1) / (y0 - y1) + x1:
+            inside = not inside
+        x0, y0 = x1, y1
+    return inside
+
+
+class Fence:
+    __slots__ = ("geofence_id", "name", "kind", "ring", "center", "radius_km", "dwell_seconds", "bbox")
+
+    def __init__(self, geofence_id, name, kind, polygon=None, center=None, radius_km=None, dwell_seconds=None):
+        """ValueError kalau geometri tidak valid."""
+        self.geofence_id = geofence_id
+        self.name = name
+        self.kind = kind
+        self.dwell_seconds = dwell_seconds
+        self.ring = None
+        self.center = None
+        self.radius_km = None
+        if kind == "polygon":
+            ring = [(float(lon), float(lat)) for lon, lat in (polygon or [])]
+            if len(ring) > 1 and ring[0] == ring[-1]:
+                ring.pop()
+            if len(ring) < 3:
+                raise ValueError("polygon butuh minimal 3 titik [lon, lat]")
+            if any(not (-180 <= x <= 180 and -90 <= y <= 90) for x, y in ring):
+                raise ValueError("koordinat polygon di luar rentang lon/lat")
+            self.ring = ring
+            xs, ys = [x for x, _ in ring], [y for _, y in ring]
+            self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        elif kind == "circle":
+            if center is None or radius_km is None or radius_km <= 0:
+                raise ValueError("circle butuh center_lat, center_lon dan radius_km > 0")
+            lat, lon = float(center[0]), float(center[1])
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+                raise ValueError("center di luar rentang lat/lon")
+            self.center = (lat, lon)
+            self.radius_km = float(radius_km)
+            self.bbox = bbox_around(lat, lon, self.radius_km)
+        else:
+            raise ValueError("kind harus 'polygon' atau 'circle'")
+
+    @classmethod
+    def from_row(cls, r):
+        center = (r["center_lat"], r["center_lon"]) if r.get("center_lat") is not None else None
+        return cls(r["geofence_id"], r.get("name"), r["kind"], r.get("polygon"), center,
+                   r.get("radius_km"), r.get("dwell_seconds"))
+
+    def contains(self, lat, lon):
+        min_lon, min_lat, max_lon, max_lat = self.bbox
+        if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+            return False
+        if self.ring is not None:
+            return _point_in_ring(lat, lon, self.ring)
+        return haversine_km(self.center[0], self.center[1], lat, lon) <= self.radius_km
+
+
+class FenceIndex:
+    """Fence per sel grid (bbox fence didaftarkan ke semua sel yang dilaluinya)."""
+
+    def __init__(self, cell_deg=0.25):
+        self.cell_deg = cell_deg
+        self._cells = defaultdict(list)  # (ix, iy) -> [Fence]
+        self._fences = {}                # geofence_id -> Fence
+
+    def __len__(self):
+        return len(self._fences)
+
+    def get(self, geofence_id):
+        return self._fences.get(geofence_id)
+
+    def _cell_range(self, bbox):
+        min_lon, min_lat, max_lon, max_lat = bbox
+        c = self.cell_deg
+        return (math.floor(min_lon / c), math.floor(min_lat / c),
+                math.floor(max_lon / c), math.floor(max_lat / c))
+
+    def add(self, fence):
+        self.remove(fence.geofence_id)
+        self._fences[fence.geofence_id] = fence
+        x0, y0, x1, y1 = self._cell_range(fence.bbox)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                self._cells[(x, y)].append(fence)
+
+    def remove(self, geofence_id):
+        fence = self._fences.pop(geofence_id, None)
+        if fence is None:
+            return
+        x0, y0, x1, y1 = self._cell_range(fence.bbox)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                bucket = self._cells.get((x, y))
+                if bucket is not None:
+                    bucket.remove(fence)
+                    if not bucket:
+                        del self._cells[(x, y)]
+
+    def containing(self, lat, lon):
+        """geofence_id semua fence yang memuat (lat, lon)."""
+        c = self.cell_deg
+        bucket = self._cells.get((math.floor(lon / c), math.floor(lat / c)))
+        if not bucket:
+            return set()
+        return {f.geofence_id for f in bucket if f.contains(lat, lon)}
+
+
+class VehicleState:
+    __slots__ = ("inside", "status", "ts")
+
+    def __init__(self, inside=None, status=None, ts=None):
+        self.inside = inside or {}   # geofence_id -> [masuk_sejak (datetime), dwell_sudah_dikirim]
+        self.status = status
+        self.ts = ts
+
+    def to_dict(self):
+        return {
+            "inside": {str(fid): [since.isoformat(), dwelled] for fid, (since, dwelled) in self.inside.items()},
+            "status": self.status,
+            "ts": self.ts.isoformat() if self.ts else None,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        inside = {int(fid): [datetime.fromisoformat(since), dwelled]
+                  for fid, (since, dwelled) in (d.get("inside") or {}).items()}
+        ts = datetime.fromisoformat(d["ts"]) if d.get("ts") else None
+        return cls(inside, d.get("status"), ts)
+
+
+class GeofenceEngine:
+    def __init__(self, cell_deg=0.25):
+        self.index = FenceIndex(cell_deg)
+        self._vehicles = {}     # vehicle_id -> VehicleState
+        self.dirty = set()      # vehicle_id yang state-nya berubah sejak take_dirty()
+
+    # ---------- fence ----------
+    def set_fences(self, fences):
+        """Ganti seluruh fence. Vehicle yang ada di fence yang hilang dilepas tanpa event exit."""
+        self.index = FenceIndex(self.index.cell_deg)
+        for f in fences:
+            self.index.add(f)
+        for vid, st in self._vehicles.items():
+            gone = [fid for fid in st.inside if self.index.get(fid) is None]
+            for fid in gone:
+                del st.inside[fid]
+            if gone:
+                self.dirty.add(vid)
+
+    # ---------- state vehicle ----------
+    def restore(self, vehicle_id, state):
+        self._vehicles[vehicle_id] = VehicleState.from_dict(state)
+
+    def state(self, vehicle_id):
+        st = self._vehicles.get(vehicle_id)
+        return st.to_dict() if st is not None else None
+
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    # ---------- evaluasi ----------
+    def evaluate(self, pos):
+        """pos: dict vehicle_id, lat, lon, sog, status, ts. Return list event (dict)."""
+        vid, lat, lon, ts = pos["vehicle_id"], pos.get("lat"), pos.get("lon"), pos["ts"]
+        if lat is None or lon is None:
+            return []
+        st = self._vehicles.get(vid)
+        if st is None:
+            st = self._vehicles[vid] = VehicleState()
+        elif st.ts is not None and ts < st.ts:
+            return []
+
+        sog = pos.get("sog")
+        status = status_from_speed(sog) if sog is not None else pos.get("status")
+        hits = self.index.containing(lat, lon)
+        events = []
+
+        def emit(event, geofence_id=None, status_from=None, status_to=None):
+            events.append({
+                "vehicle_id": vid, "geofence_id": geofence_id, "event": event,
+                "status_from": status_from, "status_to": status_to,
+                "lat": lat, "lon": lon, "ts": ts,
+            })
+
+        inside = st.inside
+        for fid in [f for f in inside if f not in hits]:
+            del inside[fid]
+            emit("exit", fid)
+        for fid in hits:
+            entry = inside.get(fid)
+            if entry is None:
+                inside[fid] = entry = [ts, False]
+                emit("enter", fid)
+            dwell = self.index.get(fid).dwell_seconds
+            if dwell and not entry[1] and (ts - entry[0]).total_seconds() >= dwell:
+                entry[1] = True
+                emit("dwell", fid)
+        if status is not None and st.status is not None and status != st.status:
+            emit("status_change", status_from=st.status, status_to=status)
+        if status is not None:
+            st.status = status
+        st.ts = ts
+        self.dirty.add(vid)
+        return events
+
+    def evaluate_many(self, positions):
+        events = []
+        for p in positions:
+            events.extend(self.evaluate(p))
+        return events
@@ -0,0 +1,199 @@
+# backend/latest_store.py
+"""
+Store posisi terakhir per vehicle (process-local, in-memory).
+
+- warm    : diisi sekali dari satu query (metadata vehicle + posisi terakhir)
+- delta   : di-update incremental dari vehicle_latest yang berubah (txid >= cursor, lihat app_db);
+            posisi yang sama persis dengan isi store diabaikan (delta boleh terbaca ulang)
+- baca    : /vehicles dan /positions/latest dilayani dari memori, O(jumlah fleet)
+- spasial : index grid (geo.GridIndex) untuk /positions/within & /positions/near
+- at      : posisi diproyeksikan ke waktu `at` (dead_reckoning.py); index tetap berisi
+            fix asli, area query spasial diperlebar sejauh pergeseran maksimum
+
+Store ini tidak menyentuh DB sendiri; query dijalankan oleh app_db lalu
+hasilnya dimasukkan lewat load() / apply_many().
+"""
+import threading
+import time
+
+from dead_reckoning import expand_bbox, max_shift_km, predict
+from geo import GridIndex, haversine_km
+
+# Kolom posisi yang disimpan per vehicle
+POSITION_FIELDS = ("vehicle_id", "lat", "lon", "sog", "cog", "heading", "status", "ts")
+# Kolom metadata vehicle (hasil join vehicles [+ owners])
+VEHICLE_FIELDS = ("vehicle_id", "name", "type", "capacity", "owner")
+
+
+class LatestStore:
+    def __init__(self, refresh_interval=1.0, full_refresh_interval=300.0, index_cell_deg=0.5):
+        self.refresh_interval = refresh_interval            # detik antar delta pull
+        self.full_refresh_interval = full_refresh_interval  # detik antar warm ulang penuh
+        self._lock = threading.Lock()
+        self._vehicles = {}     # vehicle_id -> dict metadata
+        self._positions = {}    # vehicle_id -> dict posisi terakhir
+        self._index = GridIndex(index_cell_deg)  # vehicle_id -> lat/lon terakhir
+        self._order = []        # vehicle_id terurut (cache untuk output)
+        self._cursor = 0        # cursor delta (xmin snapshot pull terakhir, lihat app_db)
+        self._warm = False
+        self._last_refresh = 0.0
+        self._last_full_refresh = 0.0
+
+    # ---------- status ----------
+    @property
+    def is_warm(self):
+        return self._warm
+
+    @property
+    def cursor(self):
+        return self._cursor
+
+    def advance_cursor(self, cursor):
+        with self._lock:
+            self._cursor = max(self._cursor, int(cursor))
+
+    def needs_refresh(self, now=None):
+        now = time.monotonic() if now is None else now
+        return (not self._warm) or (now - self._last_refresh) >= self.refresh_interval
+
+    def needs_full_refresh(self, now=None):
+        now = time.monotonic() if now is None else now
+        return (not self._warm) or (now - self._last_full_refresh) >= self.full_refresh_interval
+
+    def mark_refreshed(self, now=None):
+        self._last_refresh = time.monotonic() if now is None else now
+
+    def has_vehicle(self, vehicle_id):
+        return vehicle_id in self._vehicles
+
+    def invalidate(self):
+        """Kosongkan store; baca berikutnya akan warm ulang dari DB."""
+        with self._lock:
+            self._vehicles = {}
+            self._positions = {}
+            self._index = GridIndex(self._index.cell_deg)
+            self._order = []
+            self._cursor = 0
+            self._warm = False
+
+    # ---------- tulis ----------
+    def load(self, rows, cursor):
+        """
+        Ganti seluruh isi store dari hasil query warm.
+        Tiap row berisi kolom VEHICLE_FIELDS + POSITION_FIELDS (posisi boleh NULL).
+        Return list posisi yang berbeda dari isi store sebelumnya.
+        """
+        vehicles, positions = {}, {}
+        index = GridIndex(self._index.cell_deg)
+        for r in rows:
+            vid = r["vehicle_id"]
+            vehicles[vid] = {k: r.get(k) for k in VEHICLE_FIELDS}
+            if r.get("ts") is not None:
+                positions[vid] = {k: r.get(k) for k in POSITION_FIELDS}
+                index.update(vid, r.get("lat"), r.get("lon"))
+
+        now = time.monotonic()
+        with self._lock:
+            old = self._positions
+            changed = [
+                p for vid, p in positions.items()
+                if vid not in old or old[vid]["ts"] != p["ts"]
+            ]
+            self._vehicles = vehicles
+            self._positions = positions
+            self._index = index
+            self._order = sorted(vehicles)
+            self._cursor = max(int(cursor or 0), self._cursor if self._warm else 0)
+            self._warm = True
+            self._last_refresh = now
+            self._last_full_refresh = now
+        return changed
+
+    def apply(self, row):
+        """
+        Terapkan satu posisi baru. Posisi yang lebih tua dari yang tersimpan
+        (toleran terhadap urutan ts yang acak) atau sama persis dengannya diabaikan.
+        Return True kalau posisi terakhir vehicle berubah.
+        """
+        vid = row["vehicle_id"]
+        with self._lock:
+            cur = self._positions.get(vid)
+            if cur is not None and cur["ts"] is not None and (
+                    row["ts"] < cur["ts"] or all(cur[k] == row.get(k) for k in POSITION_FIELDS)):
+                return False
+            self._positions[vid] = {k: row.get(k) for k in POSITION_FIELDS}
+            self._index.update(vid, row.get("lat"), row.get("lon"))
+            if vid not in self._vehicles:
+                # metadata belum ada (vehicle baru); isi minimal dulu
+                self._vehicles[vid] = {"vehicle_id": vid}
+                self._order = sorted(self._vehicles)
+            return True
+
+    def apply_many(self, rows):
+        """Terapkan banyak posisi; return list posisi yang berubah."""
+        changed = []
+        for r in rows:
+            if self.apply(r):
+                changed.append(self._positions[r["vehicle_id"]])
+        return changed
+
+    # ---------- baca ----------
+    def positions(self, at=None):
+        """List posisi terakhir per vehicle, urut vehicle_id (diproyeksikan ke at kalau diisi)."""
+        with self._lock:
+            order, pos = self._order, self._positions
+        if at is not None:
+            return [predict(pos[vid], at) for vid in order if vid in pos]
+        return [pos[vid] for vid in order if vid in pos]
+
+    def vehicles(self, at=None):
+        """List metadata vehicle + posisi terakhir (flat), urut vehicle_id."""
+        with self._lock:
+            order, pos, veh = self._order, self._positions, self._vehicles
+        out = []
+        for vid in order:
+            d = {k: None for k in VEHICLE_FIELDS}
+            d.update(veh[vid])
+            p = pos.get(vid)
+            if p is not None and at is not None:
+                p = predict(p, at)
+            for k in POSITION_FIELDS[1:]:
+                d[k] = p[k] if p is not None else None
+            if at is not None:
+                d["fix_ts"] = p["fix_ts"] if p is not None else None
+                d["predicted"] = p is not None and p["predicted"]
+            out.append(d)
+        return out
+
+    def within(self, bbox, at=None):
+        """Posisi terakhir di dalam bbox (minLon, minLat, maxLon, maxLat), urut vehicle_id."""
+        if at is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            out = []
+            for p in self.within(expand_bbox(bbox, max_shift_km())):
+                p = predict(p, at)
+                if min_lat <= p["lat"] <= max_lat and min_lon <= p["lon"] <= max_lon:
+                    out.append(p)
+            return out
+        with self._lock:
+            vids = self._index.within(*bbox)
+            pos = self._positions
+            return [pos[vid] for vid in sorted(vids)]
+
+    def near(self, lat, lon, radius_km, limit=None, at=None):
+        """List (jarak_km, posisi) dalam radius_km dari (lat, lon), urut jarak terdekat."""
+        if at is not None:
+            hits = []
+            for _, p in self.near(lat, lon, radius_km + max_shift_km()):
+                p = predict(p, at)
+                d = haversine_km(lat, lon, p["lat"], p["lon"])
+                if d <= radius_km:
+                    hits.append((d, p["vehicle_id"], p))
+            hits.sort(key=lambda h: (h[0], h[1]))
+            return [(d, p) for d, _, p in hits[:limit]]
+        with self._lock:
+            hits = self._index.near(lat, lon, radius_km)
+            if limit is not None:
+                hits = hits[:limit]
+            pos = self._positions
+            return [(d, pos[vid]) for d, vid in hits]
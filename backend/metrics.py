@@ -0,0 +1,216 @@
+# backend/metrics.py
+"""
+Metrik Prometheus (GET /metrics) + hook profiling per request.
+
+- http_request_duration_seconds{method,route,status} : latency per route (template
+  path, mis. /vehicles/{vehicle_id}/track, jadi kardinalitas tetap kecil)
+- db_query_duration_seconds{engine,statement}         : waktu eksekusi per statement SQL
+- db_query_errors_total{engine,statement}
+- db_pool_*{engine}                                   : snapshot pool saat scrape
+- weather_upstream_duration_seconds{upstream,outcome} / weather_upstream_errors_total
+- weather_cache_*                                     : counter cache cuaca saat scrape
+
+Metrik per proses: kalau uvicorn dijalankan dengan beberapa worker, scrape tiap
+worker (atau jalankan satu worker per container).
+
+Profiling (cProfile) dinyalakan / dimatikan saat runtime lewat POST /admin/profiling.
+Saat aktif, request dengan header X-Profile: 1 (atau sampel acak sebanyak
+sample_rate) diprofil; hasil terakhir bisa dibaca di GET /admin/profiling. Hanya
+satu request diprofil pada satu waktu; karena event loop satu thread, profil juga
+memuat coroutine lain yang kebetulan jalan bersamaan.
+"""
+import io
+import time
+import pstats
+import random
+import cProfile
+import threading
+from collections import deque
+from datetime import datetime
+
+from fastapi import Query
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from sqlalchemy import event
+
+# Bucket untuk endpoint / query yang kebanyakan < 100 ms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_LABEL_MAX = 120
+STATEMENT_LABELS_MAX = 500   # statement unik di luar batas ini masuk label "other"
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latency request HTTP per route",
+    ("method", "route", "status"), buckets=LATENCY_BUCKETS,
+)
+DB_QUERY = Histogram(
+    "db_query_duration_seconds", "Waktu eksekusi statement SQL",
+    ("engine", "statement"), buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "Statement SQL yang gagal", ("engine", "statement"))
+WEATHER_UPSTREAM = Histogram(
+    "weather_upstream_duration_seconds", "Latency panggilan ke API cuaca upstream",
+    ("upstream", "outcome"), buckets=LATENCY_BUCKETS,
+)
+WEATHER_UPSTREAM_ERRORS = Counter(
+    "weather_upstream_errors_total", "Panggilan upstream cuaca yang gagal", ("upstream", "kind"),
+)
+
+
+# ===== Statement SQL =====
+_statement_labels = {}
+
+
+def statement_label(sql):
+    """SQL -> label pendek (whitespace dirapatkan, dipotong). Di-cache per teks statement."""
+    label = _statement_labels.get(sql)
+    if label is None:
+        if len(_statement_labels) >= STATEMENT_LABELS_MAX:
+            return "other"
+        label = " ".join(sql.split())[:STATEMENT_LABEL_MAX]
+        _statement_labels[sql] = label
+    return label
+
+
+def instrument_engine(engine, name):
+    """Pasang timer per statement ke Engine sync (untuk AsyncEngine: engine.sync_engine)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_t0", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        t0 = conn.info["metrics_t0"].pop()
+        DB_QUERY.labels(name, statement_label(statement)).observe(time.perf_counter() - t0)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(ctx):
+        stack = ctx.connection.info.get("metrics_t0") if ctx.connection is not None else None
+        if stack:
+            stack.pop()
+        DB_QUERY_ERRORS.labels(name, statement_label(ctx.statement or "")).inc()
+
+
+# ===== Gauge yang dibaca saat scrape =====
+class CallbackCollector:
+    """Collector: fn() -> {label_value: {field: angka}} jadi gauge <prefix>_<field>{<label>}."""
+
+    def __init__(self, prefix, label, fn, doc):
+        self.prefix, self.label, self.fn, self.doc = prefix, label, fn, doc
+
+    def collect(self):
+        families = {}
+        for value, fields in self.fn().items():
+            for field, number in fields.items():
+                if not isinstance(number, (int, float)) or isinstance(number, bool):
+                    continue
+                if field not in families:
+                    families[field] = GaugeMetricFamily(
+                        f"{self.prefix}_{field}", f"{self.doc}: {field}", labels=[self.label],
+                    )
+                families[field].add_metric([value], number)
+        yield from families.values()
+
+
+def register_callback(prefix, label, fn, doc):
+    REGISTRY.register(CallbackCollector(prefix, label, fn, doc))
+
+
+# ===== Profiling =====
+class Profiler:
+    def __init__(self, keep=20, top=40):
+        self.enabled = False
+        self.sample_rate = 0.0
+        self.top = top
+        self.recent = deque(maxlen=keep)
+        self._busy = threading.Lock()
+
+    def wanted(self, scope):
+        if not self.enabled:
+            return False
+        if (b"x-profile", b"1") in scope.get("headers", ()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def record(self, profile, scope, seconds):
+        buf = io.StringIO()
+        pstats.Stats(profile, stream=buf).sort_stats("cumulative").print_stats(self.top)
+        self.recent.append({
+            "at": datetime.now().isoformat(),
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "seconds": round(seconds, 6),
+            "stats": buf.getvalue(),
+        })
+
+
+profiler = Profiler()
+
+
+class MetricsMiddleware:
+    """ASGI middleware: latency per route + profiling opsional. Hanya request HTTP."""
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes        # callable -> list route (app.routes), untuk endpoint -> path
+        self._paths = None
+
+    def _route(self, scope):
+        if self._paths is None:
+            self._paths = {getattr(r, "endpoint", None): r.path for r in self.routes()}
+        # Router Starlette menyalin "endpoint" route yang cocok ke scope
+        return self._paths.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profile = None
+        if profiler.wanted(scope) and profiler._busy.acquire(blocking=False):
+            profile = cProfile.Profile()
+        t0 = time.perf_counter()
+        try:
+            if profile is not None:
+                profile.enable()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - t0
+            if profile is not None:
+                profile.disable()
+                profiler.record(profile, scope, elapsed)
+                profiler._busy.release()
+            HTTP_LATENCY.labels(scope["method"], self._route(scope), str(status)).observe(elapsed)
+
+
+def setup(app):
+    """Pasang middleware metrik + GET /metrics + /admin/profiling ke app FastAPI."""
+    app.add_middleware(MetricsMiddleware, routes=lambda: app.routes)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+    @app.get("/admin/profiling")
+    def profiling_state(limit: int = Query(5, ge=0, le=profiler.recent.maxlen)):
+        """Status profiling + profil request terakhir (pstats, diurutkan cumulative)."""
+        recent = list(profiler.recent)[-limit:] if limit else []
+        return {"enabled": profiler.enabled, "sample_rate": profiler.sample_rate, "recent": recent}
+
+    @app.post("/admin/profiling")
+    def profiling_toggle(
+        enabled: bool = Query(...),
+        sample_rate: float = Query(0.0, ge=0.0, le=1.0, description="fraksi request yang diprofil tanpa header"),
+    ):
+        profiler.enabled = enabled
+        profiler.sample_rate = sample_rate
+        if not enabled:
+            profiler.recent.clear()
+        return {"enabled": profiler.enabled, "sample_rate": profiler.sample_rate}
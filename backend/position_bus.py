@@ -0,0 +1,119 @@
+# backend/position_bus.py
+"""
+Bus in-process untuk push posisi yang berubah ke subscriber (SSE / WebSocket).
+
+Publisher (refresh cache posisi terakhir) memanggil publish() dengan posisi
+yang berubah. Tiap subscriber punya filter (vehicle_id dan/atau bbox) dan
+buffer sendiri:
+- coalescing: per vehicle hanya posisi terbaru yang disimpan
+- drop-oldest: kalau buffer penuh (max_pending vehicle), entri tertua dibuang
+Jadi consumer lambat tidak pernah menahan publisher.
+
+Bus yang sama dipakai feed event geofence dengan key="event_id" (kunci unik,
+jadi tidak ada coalescing; hanya drop-oldest).
+"""
+import asyncio
+from collections import OrderedDict
+
+
+def parse_bbox(value):
+    """'minLon,minLat,maxLon,maxLat' -> tuple float. ValueError kalau format salah."""
+    parts = [float(x) for x in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox harus 'minLon,minLat,maxLon,maxLat'")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox: nilai min harus <= max")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+class Subscription:
+    def __init__(self, bus, vehicle_ids=None, bbox=None, max_pending=10000):
+        self.bus = bus
+        self.vehicle_ids = set(vehicle_ids) if vehicle_ids else None
+        self.bbox = bbox
+        self.max_pending = max_pending
+        self._pending = OrderedDict()  # vehicle_id -> posisi terbaru
+        self._event = asyncio.Event()
+        self.coalesced = 0
+        self.dropped = 0
+
+    def set_filter(self, vehicle_ids=None, bbox=None):
+        self.vehicle_ids = set(vehicle_ids) if vehicle_ids else None
+        self.bbox = bbox
+
+    def matches(self, row):
+        if self.vehicle_ids is not None and row["vehicle_id"] not in self.vehicle_ids:
+            return False
+        if self.bbox is not None:
+            lat, lon = row.get("lat"), row.get("lon")
+            if lat is None or lon is None:
+                return False
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                return False
+        return True
+
+    def offer(self, row):
+        if not self.matches(row):
+            return
+        key = row[self.bus.key]
+        if key in self._pending:
+            self.coalesced += 1
+            self._pending.move_to_end(key)
+        elif len(self._pending) >= self.max_pending:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[key] = row
+        self._event.set()
+
+    def wake(self):
+        """Bangunkan get() yang sedang menunggu (mis. setelah filter diganti)."""
+        self._event.set()
+
+    async def get(self, timeout=None):
+        """Tunggu lalu ambil semua posisi yang tertunda. List kosong kalau timeout."""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        rows = list(self._pending.values())
+        self._pending.clear()
+        self._event.clear()
+        return rows
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class PositionBus:
+    def __init__(self, key="vehicle_id"):
+        self.key = key          # kunci coalescing per subscriber (kunci unik, mis. event_id -> tanpa coalescing)
+        self._subs = set()
+        self._loop = None
+
+    @property
+    def subscriber_count(self):
+        return len(self._subs)
+
+    def subscribe(self, vehicle_ids=None, bbox=None, max_pending=10000):
+        """Dipanggil dari event loop (handler async)."""
+        self._loop = asyncio.get_running_loop()
+        sub = Subscription(self, vehicle_ids, bbox, max_pending)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        self._subs.discard(sub)
+
+    def publish(self, rows):
+        """Kirim posisi yang berubah ke semua subscriber. Harus di thread event loop."""
+        for sub in list(self._subs):
+            for row in rows:
+                sub.offer(row)
+
+    def publish_threadsafe(self, rows):
+        """publish() dari thread lain (mis. refresh cache di threadpool)."""
+        if rows and self._subs and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.publish, rows)
@@ -0,0 +1,146 @@
+# backend/serialize.py
+"""
+Serialisasi cepat untuk respons posisi yang besar.
+
+Respons dibangun langsung sebagai bytes dengan orjson (datetime -> ISO tanpa
+isoformat() per baris di Python) dan dikirim sebagai Response mentah, jadi
+jsonable_encoder FastAPI tidak ikut menelusuri tiap baris.
+
+Format (?format=):
+- json     : array objek, sama dengan respons lama
+- ndjson   : satu objek per baris, di-stream per batch (application/x-ndjson)
+- columnar : {"count", "fields", <kolom>: [...]} -> satu list per kolom, tanpa dict per baris
+
+Kompresi mengikuti Accept-Encoding: br (kalau paket brotli terpasang) atau gzip,
+hanya untuk body >= COMPRESS_MIN_BYTES.
+"""
+import gzip
+import zlib
+
+import orjson
+from fastapi import Query
+from fastapi.responses import Response, StreamingResponse
+
+try:
+    import brotli
+except ImportError:  # opsional: tanpa brotli cukup gzip
+    brotli = None
+
+FORMATS = ("json", "ndjson", "columnar")
+# ?format= untuk endpoint posisi
+FORMAT_QUERY = Query("json", alias="format", regex="^(json|ndjson|columnar)$",
+                     description="json | ndjson (stream) | columnar")
+
+# ?at= untuk endpoint posisi terakhir: posisi diproyeksikan dari sog / cog (dead_reckoning.py)
+AT_QUERY = Query(None, description="now | waktu ISO: perkiraan posisi saat itu (dead reckoning)")
+
+# Kolom yang dikembalikan /positions/latest (+ jarak untuk /positions/near)
+LATEST_FIELDS = ("vehicle_id", "lat", "lon", "sog", "status", "ts")
+NEAR_FIELDS = LATEST_FIELDS + ("distance_km",)
+# Dengan ?at=: ts = at kalau diproyeksikan, fix_ts = waktu fix asli
+PREDICTED_FIELDS = LATEST_FIELDS + ("fix_ts", "predicted")
+PREDICTED_NEAR_FIELDS = PREDICTED_FIELDS + ("distance_km",)
+NDJSON_BATCH = 1000
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 1   # level rendah: ~3x lebih cepat dari 5, body hanya ~13% lebih besar
+BROTLI_QUALITY = 4
+
+
+def dumps(obj):
+    """orjson -> bytes. NaN/inf jadi null; datetime naive jadi ISO tanpa zona (sama dengan isoformat())."""
+    return orjson.dumps(obj)
+
+
+def pick(rows, fields):
+    """Subset kolom per baris (list dict baru). fields None -> rows apa adanya."""
+    if fields is None:
+        return rows
+    return [{k: r[k] for k in fields} for r in rows]
+
+
+def columnar(rows, fields):
+    """Payload kolom: satu list per field, urutan sama dengan rows."""
+    out = {"count": len(rows), "fields": list(fields)}
+    for k in fields:
+        out[k] = [r[k] for r in rows]
+    return out
+
+
+def ndjson_chunks(rows, fields=None, batch=NDJSON_BATCH):
+    """Generator bytes NDJSON, satu chunk per `batch` baris."""
+    for i in range(0, len(rows), batch):
+        chunk = pick(rows[i:i + batch], fields)
+        yield b"\n".join(orjson.dumps(r) for r in chunk) + b"\n"
+
+
+# ===== Kompresi =====
+def choose_encoding(accept_encoding):
+    """Pilih 'br' / 'gzip' / None dari header Accept-Encoding (menghormati q=0)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def compress_stream(chunks, encoding):
+    """Kompres generator chunk secara incremental (tiap chunk langsung di-flush)."""
+    if encoding == "br":
+        comp = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            yield comp.process(chunk) + comp.flush()
+        yield comp.finish()
+    elif encoding == "gzip":
+        comp = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 = format gzip
+        for chunk in chunks:
+            yield comp.compress(chunk) + comp.flush(zlib.Z_SYNC_FLUSH)
+        yield comp.flush()
+    else:
+        yield from chunks
+
+
+def _headers(encoding):
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return headers
+
+
+def rows_response(request, rows, fields=None, fmt="json"):
+    """
+    Respons untuk list baris (dict) dalam format fmt, dikompres sesuai Accept-Encoding.
+    fields: kolom yang dikirim (None = semua kolom baris; untuk columnar diambil dari baris pertama).
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if fmt == "ndjson":
+        return StreamingResponse(
+            compress_stream(ndjson_chunks(rows, fields), encoding),
+            media_type="application/x-ndjson",
+            headers=_headers(encoding),
+        )
+    if fmt == "columnar":
+        body = dumps(columnar(rows, fields or (list(rows[0]) if rows else [])))
+    else:
+        body = dumps(pick(rows, fields))
+    if len(body) < COMPRESS_MIN_BYTES:
+        encoding = None
+    return Response(compress(body, encoding), media_type="application/json", headers=_headers(encoding))
@@ -1,10 +1,26 @@
 # simulator.py
+import os
+import sys
 import time
 import random
 import psycopg2
 from psycopg2.extras import DictCursor
 from datetime import datetime
 
+# Titik ditulis ke spool lokal dulu (simulators/spool.py) lalu di-replay ke DB di
+# belakang, jadi simulator tetap jalan walau Postgres sedang mati.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "simulators"))
+from spool import SpoolWriter  # noqa: E402
+from producer_metrics import start_metrics_server  # noqa: E402
+from gateway_writer import GatewayWriter  # noqa: E402
+
+SPOOL_DIR = os.getenv("PRODUCER_SPOOL_DIR", "spool")
+# Kalau di-set (http://host:8100 / udp://host:8101), titik dikirim ke ingest gateway
+# (backend/ingest_gateway.py) dan simulator tidak butuh koneksi / kredensial DB
+GATEWAY_URL = os.getenv("PRODUCER_GATEWAY")
+# /metrics Prometheus untuk writer (0 = mati), lihat simulators/producer_metrics.py
+METRICS_PORT = int(os.getenv("PRODUCER_METRICS_PORT", "0"))
+
 # ===== Konfigurasi koneksi ke PostgreSQL (samakan dengan docker-compose / .env) =====
 DB_NAME = "trackingdb"
 DB_USER = "tracking"
@@ -44,7 +60,13 @@ def ensure_vehicle_exists(conn):
         ))
         conn.commit()
 
-def insert_position(conn, vehicle_id: str):
+def connect_and_seed():
+    """Koneksi untuk drainer spool; vehicle demo dipastikan ada (FK positions)."""
+    conn = get_conn()
+    ensure_vehicle_exists(conn)
+    return conn
+
+def insert_position(writer, vehicle_id: str):
     # Contoh koordinat sekitar Jakarta; silakan ganti pusat area sesuai kebutuhan
     lat = -6.2 + random.uniform(-0.01, 0.01)   # ~±1.1 km lat
     lon = 106.81 + random.uniform(-0.01, 0.01) # ~±1.1 km lon (di ekuator)
@@ -54,28 +76,25 @@ def insert_position(conn, vehicle_id: str):
     status = random.choice(["Moving", "Idle", "Stopped"])
     ts = datetime.now()                         # timestamp server
 
-    with conn.cursor() as cur:
-        cur.execute("""
-            INSERT INTO positions (vehicle_id, lat, lon, sog, cog, heading, status, ts)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (vehicle_id, lat, lon, sog, cog, heading, status, ts))
-    conn.commit()
-    print(f"[{ts}] Inserted position for {vehicle_id}: lat={lat:.5f}, lon={lon:.5f}, sog={sog:.2f} km/h, status={status}")
+    writer.write(vehicle_id, lat, lon, sog, cog, heading, status, ts)
+    print(f"[{ts}] Spooled position for {vehicle_id}: lat={lat:.5f}, lon={lon:.5f}, sog={sog:.2f} km/h, "
+          f"status={status} (pending={writer.pending})")
 
 def main():
-    conn = None
+    start_metrics_server(METRICS_PORT)
+    if GATEWAY_URL:
+        writer = GatewayWriter(GATEWAY_URL, batch_size=100, stats_interval=60.0, name=VEHICLE_ID).start()
+    else:
+        writer = SpoolWriter(connect_and_seed, os.path.join(SPOOL_DIR, VEHICLE_ID),
+                             batch_size=100, stats_interval=60.0, name=VEHICLE_ID).start()
     try:
-        conn = get_conn()
-        ensure_vehicle_exists(conn)  # pastikan kendaraan ada
-
         while True:
-            insert_position(conn, VEHICLE_ID)
+            insert_position(writer, VEHICLE_ID)
             time.sleep(5)  # jeda 5 detik
     except KeyboardInterrupt:
         print("Simulator stopped by user.")
     finally:
-        if conn:
-            conn.close()
+        writer.close()  # replay sisa spool selama DB bisa
 
 if __name__ == "__main__":
     main()
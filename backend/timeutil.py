@@ -0,0 +1,22 @@
+# backend/timeutil.py
+"""
+Konvensi waktu kolom ts (positions, geofence_events, export Parquet): TIMESTAMP tanpa
+zona berisi waktu LOKAL host, sama dengan producer (datetime.now()) dan DEFAULT NOW().
+
+Semua waktu dari luar (query ?at= / from / to, body POST, datagram gateway) dinormalkan
+lewat to_local_naive() sebelum dibandingkan dengan / disimpan ke ts, dan "sekarang" di
+sisi server selalu datetime.now() (bukan utcnow()).
+"""
+from datetime import datetime
+
+
+def to_local_naive(ts):
+    """datetime ber-zona -> waktu lokal tanpa zona; naive dianggap sudah lokal. None -> None."""
+    if ts is not None and ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts
+
+
+def parse_iso_local(value):
+    """String ISO 8601 -> datetime lokal naive. ValueError kalau bukan ISO."""
+    return to_local_naive(datetime.fromisoformat(value))
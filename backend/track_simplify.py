@@ -0,0 +1,86 @@
+# backend/track_simplify.py
+"""
+Penyederhanaan track (Douglas-Peucker) ke jumlah titik target.
+
+Tiap titik diberi "importance" = jarak (km) saat titik itu dipilih sebagai
+pemisah di rekursi Douglas-Peucker (dibatasi oleh importance induknya, jadi
+monoton). Mengambil N titik dengan importance terbesar sama dengan hasil DP
+dengan epsilon tertentu, tanpa perlu mencari epsilon berulang-ulang.
+
+Titik yang berimpit / segaris (kapal parkir yang terus melapor) semuanya berjarak ~0:
+pemisah diambil di tengah segmen supaya rekursi tetap seimbang (O(n log n), bukan
+O(n^2)). Input di atas max_input dijarangkan dulu (thin) supaya waktu DP terbatas.
+"""
+import math
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON_EQ = 111.320
+DP_EPS_KM = 1e-6   # jarak <= ini dianggap 0 (titik berimpit / segaris)
+
+
+def _project(points):
+    """lat/lon -> x/y km (equirectangular di sekitar lintang rata-rata; cukup untuk track)."""
+    lat0 = math.radians(sum(p["lat"] for p in points) / len(points))
+    kx = KM_PER_DEG_LON_EQ * math.cos(lat0)
+    return [p["lon"] * kx for p in points], [p["lat"] * KM_PER_DEG_LAT for p in points]
+
+
+def dp_importance(points):
+    """Return list importance (km) per titik; titik ujung = inf."""
+    n = len(points)
+    imp = [0.0] * n
+    if n == 0:
+        return imp
+    imp[0] = imp[-1] = math.inf
+    if n < 3:
+        return imp
+
+    xs, ys = _project(points)
+    stack = [(0, n - 1, math.inf)]
+    while stack:
+        i, j, parent = stack.pop()
+        if j <= i + 1:
+            continue
+        x1, y1, x2, y2 = xs[i], ys[i], xs[j], ys[j]
+        dx, dy = x2 - x1, y2 - y1
+        seg = math.hypot(dx, dy)
+        best_k, best_d = i + 1, -1.0
+        for k in range(i + 1, j):
+            if seg == 0:
+                d = math.hypot(xs[k] - x1, ys[k] - y1)
+            else:
+                d = abs(dy * xs[k] - dx * ys[k] + x2 * y1 - y2 * x1) / seg
+            if d > best_d:
+                best_k, best_d = k, d
+        if best_d <= DP_EPS_KM:
+            best_k = (i + j) // 2
+        d = min(best_d, parent)
+        imp[best_k] = d
+        stack.append((i, best_k, d))
+        stack.append((best_k, j, d))
+    return imp
+
+
+def thin(points, max_points):
+    """Ambil <= max_points titik berjarak indeks sama, titik pertama & terakhir selalu ikut."""
+    n = len(points)
+    if max_points <= 0 or n <= max_points:
+        return list(points)
+    if max_points == 1:
+        return [points[-1]]
+    step = (n - 1) / (max_points - 1)
+    return [points[round(k * step)] for k in range(max_points)]
+
+
+def simplify_to_count(points, target, max_input=None):
+    """
+    Sederhanakan track (list dict dengan lat/lon, urut waktu) menjadi <= target titik.
+    max_input: kalau diisi, track dijarangkan dulu ke jumlah itu sebelum DP.
+    """
+    if target <= 0 or len(points) <= target:
+        return list(points)
+    if max_input:
+        points = thin(points, max(max_input, target))
+    imp = dp_importance(points)
+    keep = sorted(range(len(points)), key=lambda k: imp[k], reverse=True)[:max(2, target)]
+    return [points[k] for k in sorted(keep)]
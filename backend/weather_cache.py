@@ -0,0 +1,239 @@
+# backend/weather_cache.py
+"""
+Cache cuaca spatio-temporal untuk /get_full_weather_data.
+
+Key = (lat, lon) yang di-snap ke grid (derajat) + waktu dibulatkan ke jam,
+jadi permintaan dari kapal-kapal yang berdekatan jatuh ke sel yang sama.
+
+- TTL + LRU eviction
+- request coalescing: miss bersamaan untuk sel yang sama -> satu panggilan upstream
+- counter hit / miss / coalesced / error
+- backend pluggable: MemoryBackend (per proses) atau SqliteBackend (dipakai
+  bersama beberapa worker di satu host). Backend dengan blocking = True (I/O file,
+  busy timeout) dipanggil lewat asyncio.to_thread supaya tidak memblok event loop
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+
+# ===== Key =====
+def snap(value, grid_deg):
+    """Snap koordinat ke pusat sel grid terdekat."""
+    return round(round(value / grid_deg) * grid_deg, 6)
+
+
+def round_to_hour(time_str):
+    """Bulatkan waktu ISO ke jam terdekat; return string ISO. ValueError kalau format salah."""
+    ts = datetime.fromisoformat(time_str.replace("Z", "+00:00"))
+    ts = ts.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1 if ts.minute >= 30 else 0)
+    return ts.isoformat()
+
+
+def cell_for(lat, lon, time_str, grid_deg):
+    """Return (lat_sel, lon_sel, jam_iso) untuk satu permintaan."""
+    return snap(lat, grid_deg), snap(lon, grid_deg), round_to_hour(time_str)
+
+
+def cell_key(cell):
+    return "%s:%s:%s" % cell
+
+
+# ===== Backends =====
+class MemoryBackend:
+    """LRU + TTL di memori proses."""
+
+    blocking = False
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SqliteBackend:
+    """LRU + TTL di file SQLite lokal (dipakai bersama antar worker/proses)."""
+
+    blocking = True   # bisa menunggu lock file sampai busy timeout (5 detik)
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS weather_cache (
+                  key         TEXT PRIMARY KEY,
+                  value       TEXT NOT NULL,
+                  expires_at  REAL NOT NULL,
+                  accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_weather_cache_accessed ON weather_cache(accessed_at)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, expires_at FROM weather_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            conn.execute("DELETE FROM weather_cache WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE weather_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO weather_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + ttl, now),
+        )
+        # buang yang kedaluwarsa, lalu yang paling lama tidak diakses
+        conn.execute("DELETE FROM weather_cache WHERE expires_at <= ?", (now,))
+        conn.execute("""
+            DELETE FROM weather_cache WHERE key IN (
+              SELECT key FROM weather_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def clear(self):
+        self._conn().execute("DELETE FROM weather_cache")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM weather_cache").fetchone()[0]
+
+
+# ===== Cache =====
+class WeatherCache:
+    def __init__(self, backend, ttl=1800.0, grid_deg=0.1):
+        self.backend = backend
+        self.ttl = ttl              # detik
+        self.grid_deg = grid_deg    # ukuran sel grid (derajat)
+        self._inflight = {}         # key -> asyncio.Task (miss yang sedang di-fetch)
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def cell(self, lat, lon, time_str):
+        return cell_for(lat, lon, time_str, self.grid_deg)
+
+    async def get_or_fetch(self, cell, fetch):
+        """
+        Ambil data sel dari cache; kalau miss panggil fetch(lat, lon, time)
+        dengan koordinat/waktu sel. Miss bersamaan untuk sel yang sama
+        menunggu satu fetch yang sama. Error tidak di-cache.
+        """
+        key = cell_key(cell)
+        value = await self._call(self.backend.get, key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # fetch jalan sebagai task sendiri: kalau request pemicu dibatalkan,
+            # penunggu lain tetap dapat hasilnya
+            task = asyncio.ensure_future(self._fetch_and_store(key, cell, fetch))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key, cell, fetch):
+        # tetap terdaftar di _inflight sampai tersimpan: miss yang datang selama set()
+        # menunggu (thread) ikut task ini, bukan fetch ulang
+        try:
+            try:
+                value = await fetch(*cell)
+            except Exception:
+                self.errors += 1
+                raise
+            try:
+                await self._call(self.backend.set, key, value, self.ttl)
+            except Exception:
+                logging.exception("weather cache: simpan %s gagal", key)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "entries": len(self.backend),
+            "inflight": len(self._inflight),
+            "ttl": self.ttl,
+            "grid_deg": self.grid_deg,
+        }
+
+
+def cache_from_env(env):
+    """Bangun WeatherCache dari variabel lingkungan (dict-like, mis. os.environ)."""
+    max_entries = int(env.get("WEATHER_CACHE_MAX_ENTRIES", "10000"))
+    if env.get("WEATHER_CACHE_BACKEND", "memory") == "sqlite":
+        backend = SqliteBackend(env.get("WEATHER_CACHE_PATH", "weather_cache.sqlite3"), max_entries)
+    else:
+        backend = MemoryBackend(max_entries)
+    return WeatherCache(
+        backend,
+        ttl=float(env.get("WEATHER_CACHE_TTL", "1800")),
+        grid_deg=float(env.get("WEATHER_GRID_DEG", "0.1")),
+    )
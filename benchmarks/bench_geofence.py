@@ -0,0 +1,124 @@
+# benchmarks/bench_geofence.py
+"""
+Benchmark engine geofence (backend/geofence.py) tanpa DB.
+
+- fences   : campuran polygon (5-8 titik) & circle, radius 1-15 km, tersebar di
+             kotak Indonesia (lon 95..141, lat -11..6)
+- posisi   : vehicle random walk (~22 km/h, tiap 10 detik), sebagian mulai di dalam fence
+- index    : GeofenceEngine (FenceIndex per sel grid) -> posisi/s, event/s
+- scan     : cek semua fence per posisi (sampel kecil) -> posisi/s + verifikasi hasil sama
+
+Contoh pakai:
+  python benchmarks/bench_geofence.py --fences 5000 --vehicles 10000 --positions 200000
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+from geofence import Fence, GeofenceEngine  # noqa: E402
+
+AREA = (95.0, -11.0, 141.0, 6.0)   # minLon, minLat, maxLon, maxLat
+SPEEDS = (0.5, 3.0, 12.0, 22.0)    # km/h -> Stopped / Idle / Moving / Moving
+
+
+def make_fences(n, rng):
+    fences = []
+    for i in range(n):
+        lon, lat = rng.uniform(AREA[0], AREA[2]), rng.uniform(AREA[1], AREA[3])
+        r_km = rng.uniform(1, 15)
+        dwell = rng.choice((None, 60, 120))
+        if i % 2:
+            fences.append(Fence(i, f"circle-{i}", "circle", center=(lat, lon), radius_km=r_km, dwell_seconds=dwell))
+            continue
+        k = rng.randint(5, 8)
+        ring = []
+        for j in range(k):
+            a = 2 * math.pi * j / k
+            d = r_km * rng.uniform(0.6, 1.0) / 111.0
+            ring.append([lon + d * math.cos(a) / math.cos(math.radians(lat)), lat + d * math.sin(a)])
+        fences.append(Fence(i, f"poly-{i}", "polygon", polygon=ring, dwell_seconds=dwell))
+    return fences
+
+
+def make_positions(fences, vehicles, count, rng):
+    """Titik berurutan per round: semua vehicle maju satu langkah tiap round."""
+    state = []
+    for v in range(vehicles):
+        if v % 4 == 0:  # seperempat vehicle mulai di dekat fence supaya ada enter / exit
+            f = fences[rng.randrange(len(fences))]
+            min_lon, min_lat, max_lon, max_lat = f.bbox
+            lat, lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        else:
+            lat, lon = rng.uniform(AREA[1], AREA[3]), rng.uniform(AREA[0], AREA[2])
+        state.append([lat, lon, rng.uniform(0, 2 * math.pi), rng.choice(SPEEDS)])
+    t0 = datetime(2025, 1, 1)
+    out = []
+    step_deg = 22.0 * 10 / 3600 / 111.0   # ~22 km/h selama 10 detik
+    rnd = 0
+    while len(out) < count:
+        ts = t0 + timedelta(seconds=10 * rnd)
+        for v, s in enumerate(state):
+            s[2] += rng.uniform(-0.3, 0.3)
+            s[0] += step_deg * math.sin(s[2])
+            s[1] += step_deg * math.cos(s[2])
+            if rng.random() < 0.05:  # sesekali ganti kecepatan -> status_change
+                s[3] = rng.choice(SPEEDS)
+            out.append({"vehicle_id": "V%05d" % v, "lat": s[0], "lon": s[1], "sog": s[3], "status": None, "ts": ts})
+            if len(out) >= count:
+                break
+        rnd += 1
+    return out
+
+
+def scan_containing(fences, lat, lon):
+    return {f.geofence_id for f in fences if f.contains(lat, lon)}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark engine geofence (posisi/s vs jumlah fence)")
+    p.add_argument("--fences", type=int, default=5000)
+    p.add_argument("--vehicles", type=int, default=10000)
+    p.add_argument("--positions", type=int, default=200_000)
+    p.add_argument("--cell-deg", type=float, default=0.25)
+    p.add_argument("--scan-sample", type=int, default=2000, help="posisi untuk pembanding scan semua fence")
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    fences = make_fences(args.fences, rng)
+    positions = make_positions(fences, args.vehicles, args.positions, rng)
+
+    engine = GeofenceEngine(args.cell_deg)
+    t0 = time.perf_counter()
+    engine.set_fences(fences)
+    build_ms = (time.perf_counter() - t0) * 1000.0
+
+    t0 = time.perf_counter()
+    events = engine.evaluate_many(positions)
+    elapsed = time.perf_counter() - t0
+    counts = {}
+    for e in events:
+        counts[e["event"]] = counts.get(e["event"], 0) + 1
+    print(f"fences={args.fences} vehicles={args.vehicles} positions={len(positions)} cell={args.cell_deg}deg "
+          f"index_build={build_ms:.1f}ms")
+    print(f"  index : {len(positions) / elapsed:>10.0f} pos/s  ({elapsed * 1e6 / len(positions):.1f} us/pos)  "
+          f"events={len(events)} {counts}")
+
+    # pembanding: cek semua fence per posisi (+ verifikasi index memberi hasil sama)
+    sample = positions[:args.scan_sample]
+    t0 = time.perf_counter()
+    expected = [scan_containing(fences, p["lat"], p["lon"]) for p in sample]
+    scan_s = time.perf_counter() - t0
+    mismatches = sum(engine.index.containing(p["lat"], p["lon"]) != e for p, e in zip(sample, expected))
+    print(f"  scan  : {len(sample) / scan_s:>10.0f} pos/s  ({scan_s * 1e6 / len(sample):.1f} us/pos)  "
+          f"mismatch={mismatches}/{len(sample)}")
+
+
+if __name__ == "__main__":
+    main()
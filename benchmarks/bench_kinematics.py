@@ -0,0 +1,63 @@
+# benchmarks/bench_kinematics.py
+"""
+Micro-benchmark geometri simulator: versi skalar (math, per vehicle) vs
+versi NumPy (satu panggilan untuk seluruh fleet).
+
+Contoh pakai:
+  python benchmarks/bench_kinematics.py --sizes 1000 10000 100000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "simulators"))
+import kinematics  # noqa: E402
+from producer_ship import bearing_deg, move_towards  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark geometri skalar vs vectorized")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'vehicles':>10} {'scalar ms':>12} {'numpy ms':>10} {'scalar v/s':>14} {'numpy v/s':>14} {'speedup':>8}")
+    for n in args.sizes:
+        lat = rng.uniform(-7.0, -5.0, n)
+        lon = rng.uniform(105.0, 112.0, n)
+        tlat = lat + rng.uniform(-0.5, 0.5, n)
+        tlon = lon + rng.uniform(-0.5, 0.5, n)
+        step = rng.uniform(0.01, 0.1, n)
+        py = [tuple(map(float, t)) for t in zip(lat, lon, tlat, tlon, step)]
+
+        def scalar():
+            for a, b, c, d, s in py:
+                na, nb, _ = move_towards(a, b, c, d, s)
+                bearing_deg(a, b, na, nb)
+
+        def vectorized():
+            na, nb, _ = kinematics.move_towards(lat, lon, tlat, tlon, step)
+            kinematics.bearing_deg(lat, lon, na, nb)
+
+        ts = best_of(scalar, args.repeat)
+        tv = best_of(vectorized, args.repeat)
+        print(f"{n:>10} {ts * 1000:>12.2f} {tv * 1000:>10.2f} {n / ts:>14,.0f} {n / tv:>14,.0f} {ts / tv:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_serialization.py
+"""
+Benchmark serialisasi respons posisi: jalur lama vs backend/serialize.py.
+
+legacy   : _rows_to_dict_list (copy dict + isoformat per baris) -> jsonable_encoder
+           -> json.dumps (yang dilakukan FastAPI untuk return list dict)
+json     : orjson atas subset kolom
+columnar : orjson atas satu list per kolom
+ndjson   : gabungan chunk NDJSON
++ ukuran body setelah gzip / br (br hanya kalau paket brotli terpasang)
+
+Contoh pakai:
+  python benchmarks/bench_serialization.py --sizes 1000 10000 100000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+import serialize  # noqa: E402
+
+LATEST_FIELDS = ("vehicle_id", "lat", "lon", "sog", "status", "ts")
+
+
+def make_rows(n, rng):
+    now = datetime.utcnow()
+    return [
+        {
+            "vehicle_id": "SHIP%06d" % i,
+            "lat": rng.uniform(-11, 6), "lon": rng.uniform(95, 141),
+            "sog": rng.uniform(0, 25), "cog": rng.uniform(0, 360), "heading": rng.uniform(0, 360),
+            "status": rng.choice(("Moving", "Idle", "Slow")),
+            "ts": now - timedelta(seconds=rng.randint(0, 3600), microseconds=rng.randint(0, 999999)),
+        }
+        for i in range(n)
+    ]
+
+
+def legacy(rows):
+    out = []
+    for r in ({k: p[k] for k in LATEST_FIELDS} for p in rows):
+        d = dict(r)
+        ts = d.get("ts")
+        if isinstance(ts, datetime):
+            d["ts"] = ts.isoformat()
+        out.append(d)
+    # JSONResponse.render: ensure_ascii=False, allow_nan=False, separators compact
+    return json.dumps(jsonable_encoder(out), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def encoders():
+    return {
+        "legacy": legacy,
+        "json": lambda rows: serialize.dumps(serialize.pick(rows, LATEST_FIELDS)),
+        "columnar": lambda rows: serialize.dumps(serialize.columnar(rows, LATEST_FIELDS)),
+        "ndjson": lambda rows: b"".join(serialize.ndjson_chunks(rows, LATEST_FIELDS)),
+    }
+
+
+def measure(fn, rows, iterations):
+    samples = []
+    body = b""
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        body = fn(rows)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return round(statistics.median(samples), 3), body
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark serialisasi respons posisi")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    p.add_argument("--iterations", type=int, default=5)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    encodings = ["gzip"] + (["br"] if serialize.brotli is not None else [])
+    for n in args.sizes:
+        rows = make_rows(n, rng)
+        print(f"rows={n}")
+        for name, fn in encoders().items():
+            ms, body = measure(fn, rows, args.iterations)
+            sizes = []
+            for enc in encodings:
+                t0 = time.perf_counter()
+                compressed = serialize.compress(body, enc)
+                sizes.append(f"{enc}={len(compressed)}B/{(time.perf_counter() - t0) * 1000.0:.1f}ms")
+            print(f"  {name:<9} encode={ms:>9.3f}ms  raw={len(body)}B  " + "  ".join(sizes))
+
+
+if __name__ == "__main__":
+    main()
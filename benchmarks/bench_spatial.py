@@ -0,0 +1,80 @@
+# benchmarks/bench_spatial.py
+"""
+Benchmark query bbox / radius: scan seluruh fleet vs index grid (backend/geo.py).
+
+Fleet sintetis tersebar di area perairan Indonesia; query viewport kecil dan
+radius 25 km di sekitar pelabuhan. Dengan index, latency seharusnya hampir
+datar walau fleet membesar.
+
+Contoh pakai:
+  python benchmarks/bench_spatial.py --sizes 1000 10000 100000 --queries 500
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+from geo import GridIndex, haversine_km  # noqa: E402
+
+AREA = (95.0, -11.0, 141.0, 6.0)  # minLon, minLat, maxLon, maxLat
+
+
+def scan_near(points, lat, lon, radius_km):
+    out = [(haversine_km(lat, lon, p[0], p[1]), k) for k, p in points.items()]
+    return sorted(x for x in out if x[0] <= radius_km)
+
+
+def scan_within(points, min_lon, min_lat, max_lon, max_lat):
+    return [k for k, (la, lo) in points.items() if min_lat <= la <= max_lat and min_lon <= lo <= max_lon]
+
+
+def measure(fn, queries):
+    samples = []
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(*q)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 4),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 4),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark index spasial posisi terakhir")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--cell-deg", type=float, default=0.5)
+    p.add_argument("--radius-km", type=float, default=25.0)
+    p.add_argument("--seed", type=int, default=42)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    min_lon, min_lat, max_lon, max_lat = AREA
+    for n in args.sizes:
+        points = {
+            "V%06d" % i: (rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon))
+            for i in range(n)
+        }
+        index = GridIndex(args.cell_deg)
+        for k, (la, lo) in points.items():
+            index.update(k, la, lo)
+
+        centers = [(rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)) for _ in range(args.queries)]
+        near_q = [(la, lo, args.radius_km) for la, lo in centers]
+        bbox_q = [(lo - 0.5, la - 0.3, lo + 0.5, la + 0.3) for la, lo in centers]
+
+        print(f"fleet={n}")
+        print("  near   scan :", measure(lambda *q: scan_near(points, *q), near_q))
+        print("  near   index:", measure(index.near, near_q))
+        print("  within scan :", measure(lambda *q: scan_within(points, *q), bbox_q))
+        print("  within index:", measure(index.within, bbox_q))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/stub_weather.py
+"""
+Stub server lokal untuk upstream cuaca (OpenWeather + StormGlass), dengan
+injeksi latency dan kegagalan. Dipakai untuk mengukur / mencoba
+/get_full_weather_data tanpa memanggil API asli.
+
+Contoh pakai:
+  python benchmarks/stub_weather.py --port 9100 --openweather-latency-ms 300 \
+    --stormglass-latency-ms 500 --fail-rate 0.05
+
+  OPENWEATHER_URL=http://127.0.0.1:9100/data/2.5/weather \
+  STORMGLASS_URL=http://127.0.0.1:9100/v2/weather/point APP_BACKEND=none \
+    uvicorn app:app --app-dir backend
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, openweather_latency, stormglass_latency, jitter, fail_rate, seed=None):
+        self.latency = {"openweather": openweather_latency, "stormglass": stormglass_latency}
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {"openweather": 0, "stormglass": 0}
+
+    def delay_and_fail(self, upstream):
+        with self.lock:
+            self.calls[upstream] += 1
+            delay = self.latency[upstream] + self.rng.uniform(0, self.jitter)
+            fail = self.rng.random() < self.fail_rate
+        time.sleep(delay)
+        return fail
+
+
+def openweather_payload(q):
+    return {
+        "coord": {"lat": float(q["lat"][0]), "lon": float(q["lon"][0])},
+        "weather": [{"description": "scattered clouds"}],
+        "main": {"temp": 29.5, "humidity": 74, "pressure": 1009},
+        "wind": {"speed": 4.1, "deg": 120},
+    }
+
+
+def stormglass_payload(q):
+    return {
+        "hours": [{
+            "time": q.get("start", [""])[0],
+            "waveHeight": {"sg": 0.8},
+            "swellHeight": {"sg": 0.5},
+            "windSpeed": {"sg": 4.0},
+            "windDirection": {"sg": 118.0},
+            "airTemperature": {"sg": 29.1},
+        }]
+    }
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = parse_qs(url.query)
+            if url.path.endswith("/data/2.5/weather"):
+                upstream, build = "openweather", openweather_payload
+            elif url.path.endswith("/v2/weather/point"):
+                upstream, build = "stormglass", stormglass_payload
+            elif url.path == "/stats":
+                return self._send(200, {"calls": state.calls})
+            else:
+                return self._send(404, {"error": "not found"})
+
+            if state.delay_and_fail(upstream):
+                return self._send(503, {"error": "injected failure"})
+            self._send(200, build(q))
+
+        def _send(self, status, body):
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # default 5: koneksi serentak di atas itu menunggu retransmit SYN (~1 detik)
+
+
+def start_stub(host="127.0.0.1", port=0, openweather_latency=0.0, stormglass_latency=0.0,
+               jitter=0.0, fail_rate=0.0, seed=None):
+    """Jalankan stub di thread background. Return (server, state); server.server_port = port aktual."""
+    state = StubState(openweather_latency, stormglass_latency, jitter, fail_rate, seed)
+    server = StubServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, name="stub-weather", daemon=True).start()
+    return server, state
+
+
+def main():
+    p = argparse.ArgumentParser(description="Stub upstream cuaca dengan latency/failure injection")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=9100)
+    p.add_argument("--openweather-latency-ms", type=float, default=200.0)
+    p.add_argument("--stormglass-latency-ms", type=float, default=300.0)
+    p.add_argument("--jitter-ms", type=float, default=0.0, help="tambahan latency acak 0..N ms")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="peluang respon 503 (0..1)")
+    p.add_argument("--seed", type=int, default=None)
+    args = p.parse_args()
+
+    server, _ = start_stub(args.host, args.port, args.openweather_latency_ms / 1000.0,
+                           args.stormglass_latency_ms / 1000.0, args.jitter_ms / 1000.0,
+                           args.fail_rate, args.seed)
+    print(f"stub weather listening on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
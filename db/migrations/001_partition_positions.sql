@@ -0,0 +1,27 @@
+-- Migrasi DB lama (positions tanpa partisi) ke layout partisi di db/schema.sql.
+-- Jalankan sekali dengan psql (memakai \ir), saat producer sedang berhenti:
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrations/001_partition_positions.sql
+BEGIN;
+
+ALTER TABLE positions RENAME TO positions_old;
+ALTER INDEX IF EXISTS idx_positions_vehicle_ts RENAME TO idx_positions_old_vehicle_ts;
+ALTER INDEX IF EXISTS idx_positions_ts RENAME TO idx_positions_old_ts;
+
+\ir ../schema.sql
+
+-- partisi untuk seluruh rentang data lama
+SELECT positions_ensure_partitions(
+  COALESCE((SELECT min(ts) FROM positions_old)::date, CURRENT_DATE),
+  GREATEST(CURRENT_DATE - COALESCE((SELECT min(ts) FROM positions_old)::date, CURRENT_DATE), 0) + 8
+);
+
+INSERT INTO positions (id, vehicle_id, lat, lon, sog, cog, heading, status, ts)
+SELECT id, vehicle_id, lat, lon, sog, cog, heading, status, COALESCE(ts, NOW())
+FROM positions_old;
+
+SELECT setval(pg_get_serial_sequence('positions', 'id'),
+              GREATEST((SELECT COALESCE(max(id), 0) FROM positions), 1));
+
+DROP TABLE positions_old;
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- Tambah tabel vehicle_latest + trigger (db/schema.sql) ke DB yang sudah ada,
+-- lalu isi dari riwayat positions. Butuh 001_partition_positions.sql sudah dijalankan.
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrations/002_vehicle_latest.sql
+BEGIN;
+
+\ir ../schema.sql
+
+-- isi awal: titik terakhir per vehicle (memakai idx_positions_vehicle_ts)
+INSERT INTO vehicle_latest (vehicle_id, position_id, lat, lon, sog, cog, heading, status, ts)
+SELECT v.vehicle_id, p.id, p.lat, p.lon, p.sog, p.cog, p.heading, p.status, p.ts
+FROM vehicles v
+JOIN LATERAL (
+  SELECT id, lat, lon, sog, cog, heading, status, ts
+  FROM positions p2
+  WHERE p2.vehicle_id = v.vehicle_id
+  ORDER BY ts DESC, id DESC
+  LIMIT 1
+) p ON TRUE
+ON CONFLICT (vehicle_id) DO NOTHING;
+
+COMMIT;
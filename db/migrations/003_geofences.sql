@@ -0,0 +1,7 @@
+-- Tambah tabel geofence (db/schema.sql) ke DB yang sudah ada.
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrations/003_geofences.sql
+BEGIN;
+
+\ir ../schema.sql
+
+COMMIT;
@@ -0,0 +1,8 @@
+-- positions_ensure_partitions() versi baru (db/schema.sql): baris di positions_default
+-- dipindah ke partisi yang dibuat, bukan membuat job maintenance gagal.
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrations/004_partition_default_rows.sql
+BEGIN;
+
+\ir ../schema.sql
+
+COMMIT;
@@ -0,0 +1,8 @@
+-- Kolom vehicle_latest.txid + trigger baru (db/schema.sql): delta cache API memakai
+-- xmin snapshot, bukan position_id, supaya commit yang tidak urut id tidak terlewat.
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrations/005_vehicle_latest_txid.sql
+BEGIN;
+
+\ir ../schema.sql
+
+COMMIT;
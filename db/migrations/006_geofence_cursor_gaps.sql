@@ -0,0 +1,8 @@
+-- Kolom geofence_cursor.gaps (db/schema.sql): worker geofence membaca ulang id yang
+-- dilompati cursor, supaya posisi yang commit tidak urut id tidak terlewat.
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrations/006_geofence_cursor_gaps.sql
+BEGIN;
+
+\ir ../schema.sql
+
+COMMIT;
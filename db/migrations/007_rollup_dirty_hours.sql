@@ -0,0 +1,10 @@
+-- Penanda jam rollup yang menerima titik terlambat (db/schema.sql: positions_rollup_dirty,
+-- trg_positions_rollup_dirty, positions_refresh_dirty_rollups()). Riwayat yang ditulis
+-- sebelum migrasi ini tidak ditandai; hitung ulang sekali dengan
+--   python backend/maintenance.py --refresh-from <awal riwayat>
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrations/007_rollup_dirty_hours.sql
+BEGIN;
+
+\ir ../schema.sql
+
+COMMIT;
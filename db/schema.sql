@@ -7,8 +7,10 @@ CREATE TABLE IF NOT EXISTS vehicles (
   owner      VARCHAR
 );
 
+-- positions dipartisi per rentang waktu (ts); partisi dibuat / dibuang oleh
+-- positions_ensure_partitions() / positions_drop_partitions() (lihat backend/maintenance.py)
 CREATE TABLE IF NOT EXISTS positions (
-  id         SERIAL PRIMARY KEY,
+  id         BIGSERIAL,
   vehicle_id VARCHAR REFERENCES vehicles(vehicle_id),
   lat        DOUBLE PRECISION,
   lon        DOUBLE PRECISION,
@@ -16,9 +18,289 @@ CREATE TABLE IF NOT EXISTS positions (
   cog        FLOAT,     -- course over ground
   heading    FLOAT,
   status     VARCHAR,
-  ts         TIMESTAMP DEFAULT NOW()
-);
+  ts         TIMESTAMP NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (id, ts)  -- kunci partisi wajib masuk primary key
+) PARTITION BY RANGE (ts);
+
+-- Penampung baris di luar partisi yang ada (seharusnya kosong kalau job maintenance jalan)
+CREATE TABLE IF NOT EXISTS positions_default PARTITION OF positions DEFAULT;
 
--- Index yang membantu query posisi terakhir
+-- Index yang membantu query posisi terakhir (otomatis dibuat di tiap partisi)
 CREATE INDEX IF NOT EXISTS idx_positions_vehicle_ts ON positions(vehicle_id, ts DESC);
 CREATE INDEX IF NOT EXISTS idx_positions_ts       ON positions(ts DESC);
+
+-- ===== Posisi terakhir per vehicle (dipelihara trigger saat insert) =====
+-- Satu baris per vehicle; endpoint baca (/vehicles, /positions/latest) tidak perlu
+-- lagi mencari "titik terakhir" di seluruh riwayat positions.
+CREATE TABLE IF NOT EXISTS vehicle_latest (
+  vehicle_id  VARCHAR PRIMARY KEY REFERENCES vehicles(vehicle_id),
+  position_id BIGINT    NOT NULL,   -- positions.id dari titik ini
+  lat         DOUBLE PRECISION,
+  lon         DOUBLE PRECISION,
+  sog         FLOAT,
+  cog         FLOAT,
+  heading     FLOAT,
+  status      VARCHAR,
+  ts          TIMESTAMP NOT NULL,
+  txid        BIGINT    NOT NULL DEFAULT 0   -- transaksi terakhir yang mengubah baris (pg_current_xact_id)
+);
+ALTER TABLE vehicle_latest ADD COLUMN IF NOT EXISTS txid BIGINT NOT NULL DEFAULT 0;
+
+-- Pull delta cache API: WHERE txid >= xmin snapshot pull sebelumnya. position_id tidak
+-- bisa dipakai sebagai cursor: writer paralel commit tidak urut id, jadi baris dengan id
+-- lebih kecil bisa muncul setelah cursor melewatinya. Transaksi < xmin snapshot sudah
+-- selesai semua saat snapshot diambil, jadi pasti sudah terbaca di pull itu.
+DROP INDEX IF EXISTS idx_vehicle_latest_position_id;
+CREATE INDEX IF NOT EXISTS idx_vehicle_latest_txid ON vehicle_latest(txid, vehicle_id);
+
+-- Upsert per statement (INSERT banyak baris / COPY -> satu upsert per vehicle).
+-- Titik dengan ts lebih tua dari yang tersimpan diabaikan (toleran urutan acak).
+CREATE OR REPLACE FUNCTION vehicle_latest_upsert() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO vehicle_latest AS vl (vehicle_id, position_id, lat, lon, sog, cog, heading, status, ts, txid)
+  SELECT DISTINCT ON (vehicle_id) vehicle_id, id, lat, lon, sog, cog, heading, status, ts,
+         pg_current_xact_id()::text::bigint
+  FROM new_rows
+  WHERE vehicle_id IS NOT NULL
+  ORDER BY vehicle_id, ts DESC, id DESC   -- urutan vehicle_id tetap: urutan lock konsisten
+  ON CONFLICT (vehicle_id) DO UPDATE SET
+    position_id = EXCLUDED.position_id,
+    lat = EXCLUDED.lat, lon = EXCLUDED.lon, sog = EXCLUDED.sog, cog = EXCLUDED.cog,
+    heading = EXCLUDED.heading, status = EXCLUDED.status, ts = EXCLUDED.ts, txid = EXCLUDED.txid
+  WHERE (EXCLUDED.ts, EXCLUDED.position_id) > (vl.ts, vl.position_id);
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER trg_positions_vehicle_latest
+  AFTER INSERT ON positions
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION vehicle_latest_upsert();
+
+-- Buat partisi (harian / mingguan) yang mencakup p_from .. p_from + p_ahead_days.
+-- Nama partisi: positions_YYYYMMDD (tanggal awal rentang). Return jumlah partisi baru.
+-- Kalau positions_default sudah berisi baris di rentang itu (setelah migrasi / backfill),
+-- CREATE ... PARTITION OF akan gagal: tabel dibuat terpisah, baris dipindah dari default,
+-- lalu di-ATTACH. Rentang yang tetap gagal dilewati (WARNING), rentang lain jalan terus.
+CREATE OR REPLACE FUNCTION positions_ensure_partitions(
+  p_from DATE DEFAULT CURRENT_DATE,
+  p_ahead_days INTEGER DEFAULT 7,
+  p_interval TEXT DEFAULT 'day'   -- 'day' | 'week' (jangan diganti setelah ada partisi)
+) RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+  part_start DATE;
+  part_end   DATE;
+  part_name  TEXT;
+  moved      BIGINT;
+  created    INTEGER := 0;
+BEGIN
+  IF p_interval NOT IN ('day', 'week') THEN
+    RAISE EXCEPTION 'p_interval harus day atau week, bukan %', p_interval;
+  END IF;
+  part_start := date_trunc(p_interval, p_from)::date;
+  WHILE part_start <= p_from + p_ahead_days LOOP
+    part_end  := (part_start + ('1 ' || p_interval)::interval)::date;
+    part_name := 'positions_' || to_char(part_start, 'YYYYMMDD');
+    IF to_regclass(part_name) IS NULL THEN
+      BEGIN
+        IF EXISTS (SELECT 1 FROM positions_default WHERE ts >= part_start AND ts < part_end) THEN
+          -- tahan insert baru ke default selama baris dipindah (insert ke partisi lain tetap jalan)
+          LOCK TABLE positions_default IN EXCLUSIVE MODE;
+          EXECUTE format('CREATE TABLE %I (LIKE positions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', part_name);
+          EXECUTE format(
+            'WITH m AS (DELETE FROM positions_default WHERE ts >= %L AND ts < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM m',
+            part_start, part_end, part_name
+          );
+          GET DIAGNOSTICS moved = ROW_COUNT;
+          EXECUTE format(
+            'ALTER TABLE positions ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            part_name, part_start, part_end
+          );
+          RAISE NOTICE 'positions_ensure_partitions: % baris dipindah dari positions_default ke %',
+            moved, part_name;
+        ELSE
+          EXECUTE format(
+            'CREATE TABLE %I PARTITION OF positions FOR VALUES FROM (%L) TO (%L)',
+            part_name, part_start, part_end
+          );
+        END IF;
+        created := created + 1;
+      EXCEPTION WHEN OTHERS THEN
+        RAISE WARNING 'positions_ensure_partitions: % dilewati: %', part_name, SQLERRM;
+      END;
+    END IF;
+    part_start := part_end;
+  END LOOP;
+  RETURN created;
+END;
+$$;
+
+-- Buang partisi yang seluruh isinya lebih tua dari p_before (retention). Return jumlah partisi yang di-drop.
+CREATE OR REPLACE FUNCTION positions_drop_partitions(p_before TIMESTAMP)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+  part    RECORD;
+  dropped INTEGER := 0;
+BEGIN
+  FOR part IN
+    SELECT c.relname,
+           substring(pg_get_expr(c.relpartbound, c.oid) FROM 'TO \(''([^'']+)''\)')::timestamp AS upper_bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'positions'::regclass
+      AND pg_get_expr(c.relpartbound, c.oid) <> 'DEFAULT'
+  LOOP
+    IF part.upper_bound <= p_before THEN
+      EXECUTE format('DROP TABLE %I', part.relname);
+      dropped := dropped + 1;
+    END IF;
+  END LOOP;
+  -- baris lama yang nyasar ke partisi default dihapus per baris
+  DELETE FROM positions_default WHERE ts < p_before;
+  RETURN dropped;
+END;
+$$;
+
+-- ===== Rollup per menit / per jam (untuk query rentang panjang) =====
+CREATE TABLE IF NOT EXISTS positions_rollup_1m (
+  vehicle_id  VARCHAR   NOT NULL,
+  bucket      TIMESTAMP NOT NULL,
+  n           INTEGER   NOT NULL,
+  lat_avg     DOUBLE PRECISION,
+  lon_avg     DOUBLE PRECISION,
+  sog_avg     FLOAT,
+  sog_max     FLOAT,
+  lat_last    DOUBLE PRECISION,
+  lon_last    DOUBLE PRECISION,
+  cog_last    FLOAT,
+  heading_last FLOAT,
+  status_last VARCHAR,
+  ts_last     TIMESTAMP,
+  PRIMARY KEY (vehicle_id, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS positions_rollup_1h (LIKE positions_rollup_1m INCLUDING ALL);
+
+-- Hitung ulang rollup untuk bucket yang bersinggungan dengan [p_from, p_to) (idempotent, upsert).
+CREATE OR REPLACE FUNCTION positions_refresh_rollups(p_from TIMESTAMP, p_to TIMESTAMP)
+RETURNS VOID LANGUAGE plpgsql AS $$
+DECLARE
+  lvl RECORD;
+BEGIN
+  FOR lvl IN SELECT * FROM (VALUES ('minute', 'positions_rollup_1m'), ('hour', 'positions_rollup_1h')) v(unit, tbl)
+  LOOP
+    EXECUTE format($sql$
+      INSERT INTO %I AS r (vehicle_id, bucket, n, lat_avg, lon_avg, sog_avg, sog_max,
+                           lat_last, lon_last, cog_last, heading_last, status_last, ts_last)
+      SELECT vehicle_id, date_trunc(%L, ts), count(*), avg(lat), avg(lon), avg(sog), max(sog),
+             (array_agg(lat ORDER BY ts DESC))[1], (array_agg(lon ORDER BY ts DESC))[1],
+             (array_agg(cog ORDER BY ts DESC))[1], (array_agg(heading ORDER BY ts DESC))[1],
+             (array_agg(status ORDER BY ts DESC))[1],
+             max(ts)
+      FROM positions
+      WHERE ts >= date_trunc(%L, $1) AND ts < $2
+      GROUP BY vehicle_id, date_trunc(%L, ts)
+      ON CONFLICT (vehicle_id, bucket) DO UPDATE SET
+        n = EXCLUDED.n, lat_avg = EXCLUDED.lat_avg, lon_avg = EXCLUDED.lon_avg,
+        sog_avg = EXCLUDED.sog_avg, sog_max = EXCLUDED.sog_max,
+        lat_last = EXCLUDED.lat_last, lon_last = EXCLUDED.lon_last,
+        cog_last = EXCLUDED.cog_last, heading_last = EXCLUDED.heading_last,
+        status_last = EXCLUDED.status_last, ts_last = EXCLUDED.ts_last
+    $sql$, lvl.tbl, lvl.unit, lvl.unit, lvl.unit)
+    USING p_from, p_to;
+  END LOOP;
+END;
+$$;
+
+-- Jam yang rollup-nya perlu dihitung ulang karena ada titik datang terlambat (backfill jam
+-- virtual, replay spool setelah outage, titik gateway/UDP telat). Job maintenance hanya
+-- menghitung ulang window ROLLUP_LOOKBACK_MINUTES terakhir; jam di sini dihitung ulang utuh
+-- oleh positions_refresh_dirty_rollups().
+CREATE TABLE IF NOT EXISTS positions_rollup_dirty (
+  bucket TIMESTAMP PRIMARY KEY   -- date_trunc('hour', ts)
+);
+
+-- Titik dengan ts < sekarang - 1 menit dianggap terlambat (titik live tidak ditandai, jadi
+-- tidak ada contention). DO UPDATE (bukan DO NOTHING) mengunci baris sampai commit, jadi
+-- DELETE di positions_refresh_dirty_rollups() menunggu writer yang sedang menandai jam itu.
+CREATE OR REPLACE FUNCTION positions_mark_rollup_dirty() RETURNS TRIGGER LANGUAGE plpgsql AS $$
+BEGIN
+  INSERT INTO positions_rollup_dirty AS d (bucket)
+  SELECT DISTINCT date_trunc('hour', ts)
+  FROM new_rows
+  WHERE ts < LOCALTIMESTAMP - interval '1 minute'
+  ORDER BY 1                        -- urutan lock konsisten antar writer
+  ON CONFLICT (bucket) DO UPDATE SET bucket = d.bucket;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER trg_positions_rollup_dirty
+  AFTER INSERT ON positions
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION positions_mark_rollup_dirty();
+
+-- Hitung ulang semua jam yang ditandai lalu hapus tandanya. Return jumlah jam.
+CREATE OR REPLACE FUNCTION positions_refresh_dirty_rollups() RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  h TIMESTAMP;
+  n INTEGER := 0;
+BEGIN
+  FOR h IN
+    DELETE FROM positions_rollup_dirty
+    WHERE bucket IN (SELECT bucket FROM positions_rollup_dirty ORDER BY bucket FOR UPDATE)
+    RETURNING bucket
+  LOOP
+    PERFORM positions_refresh_rollups(h, h + interval '1 hour');
+    n := n + 1;
+  END LOOP;
+  RETURN n;
+END;
+$$;
+
+-- ===== Geofence & event (lihat backend/geofence.py, backend/geofence_worker.py) =====
+CREATE TABLE IF NOT EXISTS geofences (
+  geofence_id   BIGSERIAL PRIMARY KEY,
+  name          VARCHAR NOT NULL,
+  kind          VARCHAR NOT NULL CHECK (kind IN ('polygon', 'circle')),
+  polygon       JSONB,              -- kind=polygon: [[lon, lat], ...]
+  center_lat    DOUBLE PRECISION,   -- kind=circle
+  center_lon    DOUBLE PRECISION,
+  radius_km     DOUBLE PRECISION,
+  dwell_seconds INTEGER,            -- event dwell setelah di dalam selama ini (NULL = tanpa dwell)
+  updated_at    TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- enter / exit / dwell (geofence_id terisi) dan status_change (geofence_id NULL)
+CREATE TABLE IF NOT EXISTS geofence_events (
+  event_id    BIGSERIAL PRIMARY KEY,
+  vehicle_id  VARCHAR NOT NULL,
+  geofence_id BIGINT REFERENCES geofences(geofence_id) ON DELETE CASCADE,
+  event       VARCHAR NOT NULL,
+  status_from VARCHAR,
+  status_to   VARCHAR,
+  lat         DOUBLE PRECISION,
+  lon         DOUBLE PRECISION,
+  ts          TIMESTAMP NOT NULL,   -- ts titik posisi yang memicu event
+  created_at  TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_geofence_events_vehicle ON geofence_events(vehicle_id, event_id);
+
+-- State engine per vehicle (fence yang sedang dimasuki, status terakhir) + cursor
+-- positions.id yang sudah diproses + gap id yang dilompati cursor (transaksi yang belum
+-- commit saat dibaca); ditulis satu transaksi dengan event.
+CREATE TABLE IF NOT EXISTS geofence_vehicle_state (
+  vehicle_id VARCHAR PRIMARY KEY,
+  state      JSONB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS geofence_cursor (
+  id               INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+  last_position_id BIGINT NOT NULL,
+  gaps             JSONB  NOT NULL DEFAULT '[]'   -- [[lo, hi, sejak_epoch], ...]
+);
+ALTER TABLE geofence_cursor ADD COLUMN IF NOT EXISTS gaps JSONB NOT NULL DEFAULT '[]';
+
+-- Partisi awal: kemarin s/d seminggu ke depan
+SELECT positions_ensure_partitions(CURRENT_DATE - 1, 8);
@@ -0,0 +1,307 @@
+# simulators/batch_writer.py
+"""
+Writer posisi ter-buffer untuk producer.
+
+Titik dikumpulkan di antrian lalu di-flush ke Postgres per batch
+(batch_size tercapai atau flush_interval lewat) memakai COPY FROM STDIN
+atau execute_values. Antrian dibatasi (max_pending): kalau Postgres lambat,
+write() akan menunggu (backpressure) alih-alih memakan memori tanpa batas.
+Baris yang ditolak DB (error data) dibuang dan dihitung di rejected, tidak di-retry.
+
+Contoh pakai:
+  writer = BatchWriter(connect_db, batch_size=1000, flush_interval=1.0)
+  writer.start()
+  writer.write("SHIP01", -6.2, 106.8, 12.0, 90.0, 90.0, "Moving")
+  ...
+  writer.close()
+"""
+
+import io
+import os
+import csv
+import time
+import queue
+import threading
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from producer_metrics import FLUSH_SECONDS, register_writer, unregister_writer
+
+COLUMNS = ("vehicle_id", "lat", "lon", "sog", "cog", "heading", "status", "ts")
+COPY_SQL = f"COPY positions ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+INSERT_SQL = f"INSERT INTO positions ({', '.join(COLUMNS)}) VALUES %s"
+
+_STOP = object()
+
+
+class _Flush:
+    """Permintaan flush(): tiap thread writer flush batch-nya lalu menunggu di barrier."""
+
+    def __init__(self, threads):
+        self.barrier = threading.Barrier(threads)
+        self.done = threading.Event()
+
+
+def write_batch(conn, batch, method="copy"):
+    """Tulis list tuple COLUMNS ke positions (COPY / execute_values). Commit oleh pemanggil."""
+    with conn.cursor() as cur:
+        if method == "copy":
+            buf = io.StringIO()
+            w = csv.writer(buf)
+            for row in batch:
+                w.writerow(row[:-1] + (row[-1].isoformat(),))
+            buf.seek(0)
+            cur.copy_expert(COPY_SQL, buf)
+        else:
+            execute_values(cur, INSERT_SQL, batch, page_size=len(batch))
+
+
+class BatchWriter:
+    def __init__(self, connect, batch_size=500, flush_interval=1.0, max_pending=10000,
+                 method="copy", stats_interval=10.0, retry_delay=1.0, threads=1, name="writer"):
+        if method not in ("copy", "values"):
+            raise ValueError("method harus 'copy' atau 'values'")
+        self.connect = connect                  # factory koneksi psycopg2
+        self.name = name                        # label metrik (lihat producer_metrics.py)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval    # detik maksimum titik menunggu di buffer
+        self.method = method
+        self.stats_interval = stats_interval    # detik antar laporan rows/sec (0 = mati)
+        self.retry_delay = retry_delay
+        self.threads = threads                  # koneksi/COPY paralel (berguna untuk backfill)
+        self.max_pending = max_pending
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        self._stats_lock = threading.Lock()
+        # statistik
+        self.rows_written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.rejected = 0                       # titik yang ditolak DB (error data) dan dibuang
+        self._started_at = None
+
+    # ---------- API producer ----------
+    def start(self):
+        self._started_at = time.monotonic()
+        self._threads = [
+            threading.Thread(target=self._run, args=(i,), name=f"batch-writer-{i}", daemon=True)
+            for i in range(self.threads)
+        ]
+        for t in self._threads:
+            t.start()
+        register_writer(self)
+        return self
+
+    def write(self, vehicle_id, lat, lon, sog, cog, heading, status, ts=None):
+        """Antrikan satu titik. Blok kalau antrian penuh (backpressure)."""
+        if ts is None:
+            ts = datetime.now()  # timestamp saat titik dibuat, bukan saat flush
+        self._queue.put((vehicle_id, lat, lon, sog, cog, heading, status, ts))
+
+    def try_write_many(self, rows):
+        """
+        Antrikan tuple COLUMNS tanpa menunggu (untuk pemanggil di event loop asyncio).
+        Return jumlah yang masuk; berhenti di baris pertama yang tidak muat.
+        """
+        put = self._queue.put_nowait
+        n = 0
+        try:
+            for row in rows:
+                put(row)
+                n += 1
+        except queue.Full:
+            pass
+        return n
+
+    def flush(self, timeout=None):
+        """Paksa flush semua titik yang sudah diantrikan, tunggu sampai selesai."""
+        req = _Flush(len(self._threads))
+        for _ in self._threads:
+            self._queue.put(req)
+        return req.done.wait(timeout)
+
+    def close(self, timeout=30.0):
+        if not self._threads:
+            return
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self._threads = []
+        self._report()
+        unregister_writer(self)
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def rows_per_sec(self):
+        if not self._started_at:
+            return 0.0
+        elapsed = time.monotonic() - self._started_at
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+
+    # ---------- thread writer ----------
+    def _run(self, index):
+        batch = []
+        waiters = []
+        conn = None
+        deadline = time.monotonic() + self.flush_interval
+        # laporan hanya dari thread pertama
+        next_report = time.monotonic() + self.stats_interval if self.stats_interval and index == 0 else None
+        stop = False
+
+        while not stop:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stop = True
+            elif isinstance(item, _Flush):
+                waiters.append(item)
+            elif item is not None:
+                batch.append(item)
+
+            now = time.monotonic()
+            if stop or waiters or len(batch) >= self.batch_size or now >= deadline:
+                if batch:
+                    conn = self._flush_batch(conn, batch)
+                    batch = []
+                for w in waiters:
+                    w.barrier.wait()  # tunggu thread lain selesai flush juga
+                    w.done.set()
+                waiters = []
+                deadline = time.monotonic() + self.flush_interval
+
+            if next_report is not None and now >= next_report:
+                self._report()
+                next_report = now + self.stats_interval
+
+        if conn is not None:
+            conn.close()
+
+    def _flush_batch(self, conn, batch):
+        """
+        Tulis batch lewat conn (dibuka ulang kalau perlu). Return koneksi yang masih hidup.
+
+        Error koneksi (OperationalError / InterfaceError) di-retry sampai berhasil: selama
+        itu antrian terisi penuh dan write() ikut menunggu. Error data (IntegrityError /
+        DataError, mis. vehicle_id tidak dikenal) tidak akan sembuh dengan retry: batch
+        dibelah dua sampai baris yang ditolak terisolasi, lalu baris itu dicatat & dibuang.
+        Potongan yang sudah di-commit tidak ditulis ulang saat retry.
+        """
+        chunks = [batch]  # potongan yang belum tertulis, urut
+        while chunks:
+            chunk = chunks[0]
+            try:
+                if conn is None or conn.closed:
+                    conn = self.connect()
+                t0 = time.perf_counter()
+                write_batch(conn, chunk, self.method)
+                conn.commit()
+                FLUSH_SECONDS.labels(self.name).observe(time.perf_counter() - t0)
+                chunks.pop(0)
+                with self._stats_lock:
+                    self.rows_written += len(chunk)
+                    self.flushes += 1
+            except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                conn.rollback()
+                chunks.pop(0)
+                if len(chunk) > 1:
+                    mid = len(chunk) // 2
+                    chunks[0:0] = [chunk[:mid], chunk[mid:]]
+                    continue
+                with self._stats_lock:
+                    self.rejected += 1
+                print(f"[{datetime.now()}] writer: titik ditolak DB, dibuang: {chunk[0]!r} ({str(e).strip()})")
+            except psycopg2.Error as e:
+                with self._stats_lock:
+                    self.errors += 1
+                print(f"[{datetime.now()}] writer: flush {len(chunk)} rows gagal ({e}); retry...")
+                try:
+                    if conn is not None:
+                        conn.close()
+                except psycopg2.Error:
+                    pass
+                conn = None
+                time.sleep(self.retry_delay)
+        return conn
+
+    def _report(self):
+        print(f"[{datetime.now()}] writer: rows={self.rows_written} flushes={self.flushes} "
+              f"pending={self.pending} rate={self.rows_per_sec():.1f} rows/s rejected={self.rejected} "
+              f"errors={self.errors}")
+
+
+def add_writer_args(p):
+    """Tambahkan knob BatchWriter (+ spool, lihat spool.py) ke argparse parser."""
+    g = p.add_argument_group("batch writer")
+    g.add_argument("--batch-size", type=int, default=500, help="maks titik per flush (default: 500)")
+    g.add_argument("--flush-interval", type=float, default=1.0,
+                   help="detik maksimum titik menunggu di buffer (default: 1.0)")
+    g.add_argument("--max-pending", type=int, default=10000,
+                   help="maks titik di antrian sebelum producer menunggu (default: 10000)")
+    g.add_argument("--writer-method", choices=["copy", "values"], default="copy",
+                   help="COPY FROM STDIN atau execute_values (default: copy)")
+    g.add_argument("--writer-threads", type=int, default=1,
+                   help="koneksi COPY paralel, berguna untuk backfill (default: 1; diabaikan dengan spool)")
+    g.add_argument("--stats-interval", type=float, default=10.0,
+                   help="detik antar laporan rows/sec, 0 = mati (default: 10)")
+    g.add_argument("--gateway", default=os.getenv("PRODUCER_GATEWAY") or None, metavar="URL",
+                   help="kirim ke ingest gateway (http://host:8100 / udp://host:8101) alih-alih "
+                        "langsung ke Postgres; spool & --writer-* diabaikan (default: env PRODUCER_GATEWAY)")
+
+    g = p.add_argument_group("spool (titik ditulis ke disk dulu, di-replay ke Postgres di belakang)")
+    g.add_argument("--spool-dir", default=os.getenv("PRODUCER_SPOOL_DIR", "spool"),
+                   help="direktori spool; tiap producer memakai subdirektori sendiri (default: spool)")
+    g.add_argument("--no-spool", action="store_true",
+                   help="tulis langsung lewat BatchWriter (producer menunggu kalau DB lambat / mati)")
+    g.add_argument("--spool-max-mb", type=int, default=512, help="batas total ukuran spool (default: 512)")
+    g.add_argument("--spool-segment-mb", type=int, default=16, help="ukuran satu segmen (default: 16)")
+    g.add_argument("--spool-full", choices=["drop-oldest", "block"], default="drop-oldest",
+                   help="kalau spool penuh: buang segmen tertua atau producer menunggu (default: drop-oldest)")
+    return p
+
+
+def writer_from_args(connect, args, name="producer"):
+    """GatewayWriter kalau --gateway, SpoolWriter di <spool-dir>/<name> (default) atau BatchWriter kalau --no-spool."""
+    if args.gateway:
+        from gateway_writer import GatewayWriter  # import lokal: gateway_writer.py men-subclass BatchWriter
+        return GatewayWriter(
+            args.gateway,
+            batch_size=args.batch_size,
+            flush_interval=args.flush_interval,
+            max_pending=args.max_pending,
+            stats_interval=args.stats_interval,
+            name=name,
+        )
+    if not args.no_spool:
+        from spool import SpoolWriter  # import lokal: spool.py memakai write_batch dari modul ini
+        return SpoolWriter(
+            connect,
+            os.path.join(args.spool_dir, name),
+            batch_size=args.batch_size,
+            flush_interval=args.flush_interval,
+            method=args.writer_method,
+            stats_interval=args.stats_interval,
+            segment_bytes=args.spool_segment_mb << 20,
+            max_bytes=args.spool_max_mb << 20,
+            on_full=args.spool_full,
+            name=name,
+        )
+    return BatchWriter(
+        connect,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        max_pending=args.max_pending,
+        method=args.writer_method,
+        stats_interval=args.stats_interval,
+        threads=args.writer_threads,
+        name=name,
+    )
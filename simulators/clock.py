@@ -0,0 +1,107 @@
+# simulators/clock.py
+"""
+Jam untuk simulator: wall-clock (default) atau virtual.
+
+WallClock    : waktu nyata; sleep() benar-benar tidur, titik diberi timestamp sekarang.
+VirtualClock : waktu simulasi mulai dari --start. sleep() hanya memajukan waktu
+               simulasi (speed 0 = secepat mungkin) atau tidur 1/speed dari durasi
+               itu (speed N = N kali lebih cepat dari real-time). Timestamp titik
+               diambil dari waktu simulasi, jadi dengan --seed yang sama output
+               selalu identik.
+
+Contoh backfill sebulan secepat mungkin:
+  python simulators/fleet_sim.py --fleet simulators/fleet.example.yaml \\
+    --start 2024-01-01T00:00:00 --duration 30d --seed 1 --no-spool --batch-size 10000
+"""
+
+import os
+import re
+import time
+from datetime import datetime, timedelta
+
+import psycopg2
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def parse_duration(value):
+    """'3600' / '90m' / '12h' / '30d' / '2w' -> detik (float). ValueError kalau format salah."""
+    m = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([smhdw]?)\s*", str(value))
+    if not m:
+        raise ValueError(f"durasi tidak valid: {value!r} (contoh: 3600, 90m, 12h, 30d)")
+    return float(m.group(1)) * _UNITS[m.group(2) or "s"]
+
+
+class WallClock:
+    virtual = False
+
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def to_datetime(self, t):
+        """Waktu monotonic t -> datetime lokal."""
+        return datetime.now() + timedelta(seconds=t - time.monotonic())
+
+
+class VirtualClock:
+    virtual = True
+
+    def __init__(self, start, speed=0.0):
+        self.start = start          # datetime waktu simulasi 0
+        self.speed = speed          # 0 = secepat mungkin, N = N x real-time
+        self._t = 0.0               # detik simulasi sejak start
+        self._real_start = time.monotonic()
+
+    def now(self):
+        return self._t
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        self._t += seconds
+        if self.speed > 0:
+            # pacing terhadap titik awal (bukan per sleep) supaya tidak drift
+            wait = self._real_start + self._t / self.speed - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+    def to_datetime(self, t):
+        return self.start + timedelta(seconds=t)
+
+
+def add_clock_args(p):
+    """Tambahkan knob jam virtual ke argparse parser."""
+    g = p.add_argument_group("jam virtual (replay / backfill)")
+    g.add_argument("--start", type=datetime.fromisoformat, default=None,
+                   help="aktifkan jam virtual mulai waktu ini (ISO, mis. 2024-01-01T00:00:00)")
+    g.add_argument("--speed", type=float, default=0.0,
+                   help="kelipatan real-time untuk jam virtual; 0 = secepat mungkin (default: 0)")
+    return p
+
+
+def clock_from_args(args):
+    if args.start is None:
+        return WallClock()
+    return VirtualClock(args.start, args.speed)
+
+
+def ensure_partitions(conn, start, seconds):
+    """
+    Pastikan partisi positions ada untuk rentang simulasi (backfill ke masa lalu).
+    Tanpa ini baris jatuh ke positions_default. Diabaikan kalau skema belum dipartisi.
+    """
+    days = int(seconds // 86400) + 1
+    interval = os.getenv("POSITIONS_PARTITION_INTERVAL", "day")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT positions_ensure_partitions(%s, %s, %s)", (start.date(), days, interval))
+            created = cur.fetchone()[0]
+        conn.commit()
+        return created
+    except psycopg2.errors.UndefinedFunction:
+        conn.rollback()
+        return 0
@@ -0,0 +1,331 @@
+# simulators/fleet_sim.py
+"""
+Simulator fleet: ribuan vehicle dari satu proses.
+
+Semua vehicle dijadwalkan di satu scheduler (heap berdasarkan waktu jatuh
+tempo). Tiap tick, vehicle yang sudah jatuh tempo dimajukan satu langkah
+lalu titiknya ditulis lewat BatchWriter bersama (satu koneksi DB).
+
+Definisi fleet dari file JSON/YAML, contoh (lihat fleet.example.yaml):
+
+  defaults:
+    interval: 5
+    speed_kmh: 25
+  vehicles:
+    - vehicle_id: SHIP01
+      mode: route
+      waypoints: [[-6.20, 106.82], [-6.05, 107.00]]
+    - vehicle_id_prefix: TUG      # generate TUG0001..TUG5000
+      count: 5000
+      mode: circle
+      center: [-6.2, 106.8167]
+      radius_km: 10
+
+Mode: circle | route (sama dengan producer_ship.py) | jitter (acak di
+sekitar center, seperti backend/simulator.py).
+
+Contoh pakai:
+  python simulators/fleet_sim.py --fleet simulators/fleet.example.yaml
+
+Backfill riwayat dengan jam virtual (lihat clock.py): --start + --duration
+(waktu simulasi) + --seed; --speed 0 = secepat mungkin.
+
+Dengan --gateway http://host:8100 / udp://host:8101 titik dikirim ke ingest gateway
+(backend/ingest_gateway.py); registrasi vehicle dilakukan gateway.
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import argparse
+from datetime import datetime
+
+from psycopg2.extras import execute_values
+
+from batch_writer import add_writer_args, writer_from_args
+from clock import WallClock, add_clock_args, clock_from_args, ensure_partitions, parse_duration
+from producer_metrics import TICK_LAG, add_metrics_args, start_metrics_server
+from producer_ship import CircleMover, RouteMover, connect_db
+
+try:
+    from kinematics import step_many  # butuh NumPy
+except ImportError:
+    step_many = None
+
+# Minimal jumlah vehicle jatuh tempo dalam satu tick sebelum geometri di-vectorize
+VECTORIZE_MIN = 64
+
+DEFAULTS = {
+    "mode": "circle",
+    "interval": 5.0,
+    "speed_kmh": 25.0,
+    "center": [-6.2, 106.8167],
+    "radius_km": 10.0,
+    "type": "ship",
+}
+
+
+class JitterMover:
+    """Posisi acak di sekitar center (perilaku backend/simulator.py)."""
+
+    def __init__(self, center, jitter_deg=0.01, rng=random):
+        self.center = center
+        self.jitter_deg = jitter_deg
+        self.rng = rng
+
+    def step(self, interval):
+        rng = self.rng
+        lat = self.center[0] + rng.uniform(-self.jitter_deg, self.jitter_deg)
+        lon = self.center[1] + rng.uniform(-self.jitter_deg, self.jitter_deg)
+        sog = rng.uniform(0, 60)
+        cog = rng.uniform(0, 360)
+        heading = rng.uniform(0, 360)
+        status = rng.choice(["Moving", "Idle", "Stopped"])
+        return lat, lon, sog, cog, heading, status
+
+
+class FleetVehicle:
+    __slots__ = ("vehicle_id", "name", "type", "interval", "mover", "next_due")
+
+    def __init__(self, vehicle_id, name, vtype, interval, mover):
+        self.vehicle_id = vehicle_id
+        self.name = name
+        self.type = vtype
+        self.interval = interval
+        self.mover = mover
+        self.next_due = 0.0
+
+
+# ---------- definisi fleet ----------
+def load_fleet_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("File fleet YAML butuh PyYAML (pip install pyyaml), atau pakai JSON")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _make_mover(spec, rng):
+    mode = spec["mode"]
+    if mode == "circle":
+        return CircleMover(tuple(spec["center"]), float(spec["radius_km"]),
+                           float(spec["speed_kmh"]), rng=rng)
+    if mode == "route":
+        waypoints = [(float(a), float(b)) for a, b in spec.get("waypoints") or []]
+        return RouteMover(waypoints, float(spec["speed_kmh"]), rng=rng)
+    if mode == "jitter":
+        return JitterMover(tuple(spec["center"]), float(spec.get("jitter_deg", 0.01)), rng=rng)
+    raise ValueError(f"mode tidak dikenal: {mode!r}")
+
+
+def build_fleet(definition, rng=random):
+    """Ubah definisi fleet (dict) -> list FleetVehicle."""
+    defaults = dict(DEFAULTS)
+    defaults.update(definition.get("defaults") or {})
+
+    fleet = []
+    for entry in definition.get("vehicles") or []:
+        spec = dict(defaults)
+        spec.update(entry)
+        if "count" in spec:
+            prefix = spec.get("vehicle_id_prefix", "VHC")
+            ids = [f"{prefix}{i:04d}" for i in range(1, int(spec["count"]) + 1)]
+        else:
+            ids = [spec["vehicle_id"]]
+        for vid in ids:
+            fleet.append(FleetVehicle(
+                vid,
+                spec.get("name") or vid,
+                spec.get("type"),
+                float(spec["interval"]),
+                _make_mover(spec, rng),
+            ))
+    if not fleet:
+        raise ValueError("Definisi fleet tidak berisi vehicle")
+    return fleet
+
+
+def register_vehicles(conn, fleet):
+    """Pastikan semua vehicle ada di tabel vehicles (FK positions)."""
+    with conn.cursor() as cur:
+        execute_values(
+            cur,
+            "INSERT INTO vehicles (vehicle_id, name, type) VALUES %s ON CONFLICT (vehicle_id) DO NOTHING",
+            [(v.vehicle_id, v.name, v.type) for v in fleet],
+            page_size=1000,
+        )
+    conn.commit()
+
+
+# ---------- scheduler ----------
+class FleetScheduler:
+    """
+    Satu scheduler untuk semua vehicle. Vehicle yang tertinggal lebih dari
+    satu interval tidak "dikejar" titik per titik; jadwalnya digeser maju
+    supaya tick berikutnya tetap tepat waktu (lag dicatat di statistik).
+    """
+
+    def __init__(self, fleet, writer, rng=random, verbose=False, stats_interval=10.0, clock=None):
+        self.fleet = fleet
+        self.writer = writer
+        self.verbose = verbose
+        self.stats_interval = stats_interval   # detik nyata antar laporan
+        self.clock = clock or WallClock()
+        self._heap = []
+        start = self.clock.now()
+        for seq, v in enumerate(fleet):
+            # sebar titik pertama sepanjang interval, hindari semua vehicle tick bersamaan
+            v.next_due = start + rng.uniform(0, v.interval)
+            self._heap.append((v.next_due, seq, v))
+        heapq.heapify(self._heap)
+        # statistik
+        self.points = 0
+        self.skipped = 0
+        self.max_lag = 0.0
+
+    def tick(self, now, window=0.0):
+        """
+        Majukan semua vehicle yang jatuh tempo sampai now + window. Return jumlah titik.
+        window > 0 (jam virtual) mengumpulkan lebih banyak vehicle per tick supaya
+        geometri bisa di-vectorize; timestamp tetap jadwal masing-masing titik.
+        """
+        heap = self._heap
+        due = []
+        limit = now + window
+        while heap and heap[0][0] <= limit:
+            due.append(heapq.heappop(heap))
+        if not due:
+            return 0
+        if not self.clock.virtual:
+            # lag tick = vehicle paling lama menunggu (jam virtual selalu tepat waktu)
+            TICK_LAG.labels("fleet").observe(max(0.0, now - due[0][0]))
+
+        points = self._step([v for _, _, v in due])
+        for (due_at, seq, v), (lat, lon, sog, cog, heading, st) in zip(due, points):
+            lag = now - due_at  # negatif kalau diproses lebih awal (window)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+            # timestamp = jadwal titik (bukan saat ditulis): deterministik di jam virtual
+            ts = self.clock.to_datetime(due_at)
+            self.writer.write(v.vehicle_id, lat, lon, sog, cog, heading, st, ts)
+            if self.verbose:
+                print(f"[{ts}] {v.vehicle_id} lat={lat:.5f}, lon={lon:.5f}, sog={sog:.2f} km/h, status={st}")
+
+            v.next_due = due_at + v.interval
+            if v.next_due <= now:
+                # tertinggal > 1 interval: lompati jadwal yang terlewat
+                missed = int((now - v.next_due) // v.interval) + 1
+                self.skipped += missed
+                v.next_due += missed * v.interval
+            heapq.heappush(heap, (v.next_due, seq, v))
+        self.points += len(due)
+        return len(due)
+
+    def _step(self, vehicles):
+        """Langkah untuk semua vehicle jatuh tempo; geometri di-vectorize kalau NumPy ada."""
+        if step_many is None or len(vehicles) < VECTORIZE_MIN:
+            return [v.mover.step(v.interval) for v in vehicles]
+        points = [None] * len(vehicles)
+        # hanya CircleMover/RouteMover (punya prepare/commit); sisanya (jitter) per mover
+        batch = [i for i, v in enumerate(vehicles) if hasattr(v.mover, "prepare")]
+        if batch:
+            for i, pt in zip(batch, step_many([vehicles[i].mover for i in batch],
+                                              [vehicles[i].interval for i in batch])):
+                points[i] = pt
+        for i, v in enumerate(vehicles):
+            if points[i] is None:
+                points[i] = v.mover.step(v.interval)
+        return points
+
+    def run(self, duration=None):
+        """Jalan sampai duration detik (waktu jam: nyata atau simulasi) atau selamanya."""
+        clock = self.clock
+        started = clock.now()
+        real_started = time.monotonic()
+        # jam virtual: satu tick = semua titik dalam satu interval terpendek
+        window = min((v.interval for v in self.fleet), default=0.0) if clock.virtual else 0.0
+        next_report = real_started + self.stats_interval if self.stats_interval else None
+        last_points = 0
+        while True:
+            now = clock.now()
+            if duration is not None and now - started >= duration:
+                return
+            self.tick(now, window if duration is None else min(window, started + duration - now))
+
+            real_now = time.monotonic()
+            if next_report is not None and real_now >= next_report:
+                rate = (self.points - last_points) / self.stats_interval
+                sim = f" sim_time={clock.to_datetime(now).isoformat(timespec='seconds')}" if clock.virtual else ""
+                print(f"[{datetime.now()}] fleet: vehicles={len(self.fleet)} points={self.points} "
+                      f"rate={rate:.1f} pts/s max_lag={self.max_lag * 1000:.1f} ms "
+                      f"skipped={self.skipped} pending={self.writer.pending}{sim}")
+                last_points = self.points
+                self.max_lag = 0.0
+                next_report = real_now + self.stats_interval
+
+            # tidur sampai vehicle berikutnya jatuh tempo (jam virtual: langsung lompat)
+            wait = self._heap[0][0] - clock.now()
+            if duration is not None:
+                wait = min(wait, started + duration - clock.now())
+            clock.sleep(wait)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Simulator fleet multi-vehicle dalam satu proses")
+    p.add_argument("--fleet", required=True, help="file definisi fleet (.json / .yaml)")
+    p.add_argument("--duration", type=parse_duration, default=None,
+                   help="berhenti setelah durasi ini, mis. 3600 / 12h / 30d; waktu simulasi kalau "
+                        "--start dipakai (default: jalan terus)")
+    p.add_argument("--seed", type=int, default=None, help="seed RNG (default: acak)")
+    p.add_argument("--no-register", action="store_true",
+                   help="jangan INSERT vehicle ke tabel vehicles saat start")
+    p.add_argument("--verbose", action="store_true", help="print setiap titik")
+    add_writer_args(p)
+    add_clock_args(p)
+    add_metrics_args(p)
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    clock = clock_from_args(args)
+    fleet = build_fleet(load_fleet_file(args.fleet), rng=rng)
+    print(f"[{datetime.now()}] fleet: {len(fleet)} vehicles dari {os.path.basename(args.fleet)}")
+
+    connect = connect_db
+    if not args.no_register and not args.gateway:  # gateway mendaftarkan vehicle baru sendiri
+        # registrasi di koneksi pertama writer: kalau DB belum hidup, titik tertahan di
+        # spool dan vehicle didaftarkan begitu drainer berhasil konek
+        registered = []
+
+        def connect():
+            conn = connect_db()
+            if not registered:
+                register_vehicles(conn, fleet)
+                registered.append(True)
+            return conn
+
+    if clock.virtual and not args.gateway:  # lewat gateway: partisi diurus maintenance.py
+        conn = connect_db()
+        try:
+            ensure_partitions(conn, args.start, args.duration or 7 * 86400)
+        finally:
+            conn.close()
+
+    start_metrics_server(args.metrics_port)
+    writer = writer_from_args(connect, args, name="fleet").start()
+    try:
+        FleetScheduler(fleet, writer, rng=rng, verbose=args.verbose,
+                       stats_interval=args.stats_interval, clock=clock).run(args.duration)
+    except KeyboardInterrupt:
+        print("Fleet simulator stopped by user.")
+    finally:
+        writer.close()  # flush sisa buffer
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# simulators/gateway_writer.py
+"""
+Writer yang mengirim titik ke ingest gateway (backend/ingest_gateway.py) alih-alih
+langsung ke Postgres: producer tidak butuh kredensial DB, dan koneksi DB tidak
+bertambah per producer.
+
+  http://host:8100 : batch JSON ke POST /positions (koneksi keep-alive); 503 / 429 / error
+                     jaringan di-retry, jadi antrian penuh -> write() menunggu (backpressure).
+                     Status 4xx lain (400, 413, ...) tidak sembuh dengan retry: batch dibelah
+                     sampai titik yang ditolak terisolasi, lalu titik itu dibuang (rejected)
+  udp://host:8101  : kalimat $TRK per titik, dikemas beberapa per datagram (<= MAX_DATAGRAM);
+                     fire-and-forget, tidak ada retry / konfirmasi
+
+Antrian, batching (batch_size / flush_interval), flush() dan statistik sama dengan
+BatchWriter; hanya tujuan flush yang berbeda.
+
+Contoh pakai:
+  python simulators/fleet_sim.py --fleet simulators/fleet.example.yaml --gateway udp://localhost:8101
+"""
+
+import time
+import json
+import socket
+import http.client
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from batch_writer import BatchWriter
+from producer_metrics import FLUSH_SECONDS
+
+MAX_DATAGRAM = 1400   # di bawah MTU ethernet supaya datagram tidak terfragmentasi
+
+
+class GatewayBusy(Exception):
+    """Gateway membalas 503 / 429 (antrian writer-nya penuh): retry."""
+
+
+class GatewayRejected(Exception):
+    """Gateway menolak request (4xx selain 429, atau status tak terduga): jangan retry batch yang sama."""
+
+
+def _fmt(v):
+    return "" if v is None else repr(v) if isinstance(v, float) else str(v)
+
+
+def encode_sentence(row):
+    """Tuple kolom (vehicle_id, lat, lon, sog, cog, heading, status, ts) -> '$TRK,...*hh'."""
+    vehicle_id, lat, lon, sog, cog, heading, status, ts = row
+    body = ",".join(["TRK", vehicle_id, _fmt(lat), _fmt(lon), _fmt(sog), _fmt(cog), _fmt(heading),
+                     status or "", "%.6f" % ts.timestamp()])
+    c = 0
+    for ch in body.encode():
+        c ^= ch
+    return "$%s*%02X" % (body, c)
+
+
+class _HttpSender:
+    def __init__(self, url, timeout=10.0):
+        u = urlsplit(url)
+        self.path = (u.path.rstrip("/") or "") + "/positions"
+        self.conn = http.client.HTTPConnection(u.hostname, u.port or 80, timeout=timeout)
+
+    def send(self, batch):
+        """Return jumlah titik yang ditolak gateway."""
+        body = json.dumps([
+            {"vehicle_id": r[0], "lat": r[1], "lon": r[2], "sog": r[3], "cog": r[4],
+             "heading": r[5], "status": r[6], "ts": r[7].isoformat()}
+            for r in batch
+        ])
+        self.conn.request("POST", self.path, body, {"Content-Type": "application/json"})
+        resp = self.conn.getresponse()
+        data = resp.read()
+        if resp.status in (429, 503):
+            raise GatewayBusy(data.decode(errors="replace"))
+        if resp.status != 200:
+            raise GatewayRejected(f"HTTP {resp.status}: {data[:200].decode(errors='replace')}")
+        try:
+            result = json.loads(data)
+        except ValueError:
+            # titik sudah diterima (200); kirim ulang hanya akan menduplikasi
+            print(f"[{datetime.now()}] gateway: balasan bukan JSON: {data[:200]!r}")
+            return 0
+        if result.get("rejected"):
+            print(f"[{datetime.now()}] gateway: {result['rejected']} titik ditolak, contoh: {result['errors'][:3]}")
+        return result.get("rejected", 0)
+
+    def close(self):
+        self.conn.close()
+
+
+class _UdpSender:
+    def __init__(self, url):
+        u = urlsplit(url)
+        self.addr = (u.hostname, u.port or 8101)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, batch):
+        buf, size = [], 0
+        for row in batch:
+            s = encode_sentence(row).encode()
+            if buf and size + len(s) + 1 > MAX_DATAGRAM:
+                self.sock.sendto(b"\n".join(buf), self.addr)
+                buf, size = [], 0
+            buf.append(s)
+            size += len(s) + 1
+        if buf:
+            self.sock.sendto(b"\n".join(buf), self.addr)
+        return 0
+
+    def close(self):
+        self.sock.close()
+
+
+def sender_for(url):
+    scheme = urlsplit(url).scheme
+    if scheme == "http":
+        return _HttpSender(url)
+    if scheme == "udp":
+        return _UdpSender(url)
+    raise ValueError(f"gateway harus http://host:port atau udp://host:port, bukan {url!r}")
+
+
+class GatewayWriter(BatchWriter):
+    def __init__(self, url, name="writer", **kwargs):
+        sender_for(url).close()  # validasi URL di awal, bukan di thread writer
+        kwargs.setdefault("method", "copy")
+        super().__init__(lambda: sender_for(url), name=name, **kwargs)
+        self.url = url
+
+    def _flush_batch(self, sender, batch):
+        """
+        Kirim batch lewat sender (dibuat ulang kalau error). Return sender yang masih hidup.
+
+        Error jaringan / protokol dan gateway sibuk di-retry sampai berhasil (backpressure).
+        Penolakan (GatewayRejected) dan titik yang tidak bisa di-encode (ValueError /
+        TypeError) tidak akan sembuh dengan retry: batch dibelah dua sampai titik yang
+        ditolak terisolasi, lalu titik itu dicatat & dibuang. Potongan yang sudah terkirim
+        tidak dikirim ulang.
+        """
+        chunks = [batch]  # potongan yang belum terkirim, urut
+        while chunks:
+            chunk = chunks[0]
+            try:
+                if sender is None:
+                    sender = self.connect()
+                t0 = time.perf_counter()
+                rejected = sender.send(chunk)
+                FLUSH_SECONDS.labels(self.name).observe(time.perf_counter() - t0)
+                chunks.pop(0)
+                with self._stats_lock:
+                    self.rows_written += len(chunk) - rejected
+                    self.rejected += rejected
+                    self.flushes += 1
+            except (GatewayRejected, ValueError, TypeError) as e:
+                chunks.pop(0)
+                if len(chunk) > 1:
+                    mid = len(chunk) // 2
+                    chunks[0:0] = [chunk[:mid], chunk[mid:]]
+                    continue
+                with self._stats_lock:
+                    self.rejected += 1
+                print(f"[{datetime.now()}] gateway: titik ditolak, dibuang: {chunk[0]!r} ({e})")
+            except (OSError, http.client.HTTPException, GatewayBusy) as e:
+                with self._stats_lock:
+                    self.errors += 1
+                if not isinstance(e, GatewayBusy):
+                    print(f"[{datetime.now()}] gateway: kirim {len(chunk)} titik gagal ({e}); retry...")
+                if sender is not None:
+                    sender.close()
+                sender = None
+                time.sleep(self.retry_delay)
+        return sender
+
+    def _report(self):
+        print(f"[{datetime.now()}] gateway writer: sent={self.rows_written} flushes={self.flushes} "
+              f"pending={self.pending} rate={self.rows_per_sec():.1f} rows/s rejected={self.rejected} "
+              f"errors={self.errors}")
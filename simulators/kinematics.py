@@ -0,0 +1,82 @@
+# simulators/kinematics.py
+"""
+Versi NumPy (array) dari util geometri di producer_ship.py.
+
+Semua fungsi menerima array (atau skalar) lat/lon dalam derajat dan
+menghitung seluruh fleet sekaligus, tanpa overhead interpreter per vehicle.
+Semantik sama dengan versi skalar: jarak haversine (km), bearing 0..360,
+langkah di sepanjang great-circle.
+"""
+
+import numpy as np
+
+R_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
+    return 2*R_KM*np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dlambda = np.radians(np.subtract(lon2, lon1))
+    y = np.sin(dlambda) * np.cos(phi2)
+    x = np.cos(phi1)*np.sin(phi2) - np.sin(phi1)*np.cos(phi2)*np.cos(dlambda)
+    return (np.degrees(np.arctan2(y, x)) + 360) % 360
+
+
+def destination_point(lat, lon, brng, dist_km):
+    """Titik sejauh dist_km dari (lat, lon) dengan bearing awal brng (great-circle)."""
+    d = np.asarray(dist_km, dtype=float) / R_KM
+    phi1, lam1, theta = np.radians(lat), np.radians(lon), np.radians(brng)
+    sin_phi1, cos_phi1 = np.sin(phi1), np.cos(phi1)
+    sin_d, cos_d = np.sin(d), np.cos(d)
+    sin_phi2 = np.clip(sin_phi1*cos_d + cos_phi1*sin_d*np.cos(theta), -1.0, 1.0)
+    phi2 = np.arcsin(sin_phi2)
+    lam2 = lam1 + np.arctan2(np.sin(theta)*sin_d*cos_phi1, cos_d - sin_phi1*sin_phi2)
+    return np.degrees(phi2), (np.degrees(lam2) + 540) % 360 - 180
+
+
+def move_towards(lat, lon, target_lat, target_lon, step_km):
+    """
+    Majukan semua vehicle sejauh step_km menuju target masing-masing.
+    Return (new_lat, new_lon, remaining_km); vehicle yang langkahnya
+    melewati target berhenti tepat di target (remaining 0).
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    target_lat = np.asarray(target_lat, dtype=float)
+    target_lon = np.asarray(target_lon, dtype=float)
+    step_km = np.asarray(step_km, dtype=float)
+
+    dist = haversine_km(lat, lon, target_lat, target_lon)
+    arrived = (dist == 0) | (step_km >= dist)
+    brng = bearing_deg(lat, lon, target_lat, target_lon)
+    new_lat, new_lon = destination_point(lat, lon, brng, np.where(arrived, 0.0, step_km))
+    new_lat = np.where(arrived, target_lat, new_lat)
+    new_lon = np.where(arrived, target_lon, new_lon)
+    remaining = np.where(arrived, 0.0, dist - step_km)
+    return new_lat, new_lon, remaining
+
+
+def step_many(movers, intervals):
+    """
+    Majukan banyak mover (CircleMover/RouteMover) sekaligus.
+    Geometri dihitung dalam satu panggilan array; sisanya (RNG, status,
+    ganti target) tetap per mover. Return list (lat, lon, sog, cog, heading, status).
+    """
+    if not movers:
+        return []
+    prepared = np.array([m.prepare(iv) for m, iv in zip(movers, intervals)], dtype=float)
+    lat, lon, tgt_lat, tgt_lon, step_km = prepared.T
+    new_lat, new_lon, remaining = move_towards(lat, lon, tgt_lat, tgt_lon, step_km)
+    cog = bearing_deg(lat, lon, new_lat, new_lon)
+    return [
+        m.commit(float(a), float(b), float(r), float(c))
+        for m, a, b, r, c in zip(movers, new_lat, new_lon, remaining, cog)
+    ]
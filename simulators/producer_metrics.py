@@ -0,0 +1,116 @@
+# simulators/producer_metrics.py
+"""
+Metrik Prometheus untuk producer (--metrics-port / env PRODUCER_METRICS_PORT).
+
+Per writer (label writer = nama producer, mis. fleet / SHIP01):
+- producer_rows_written_total, producer_flushes_total, producer_flush_errors_total
+- producer_flush_duration_seconds   : waktu tulis + commit satu batch ke Postgres
+- producer_pending_rows             : titik di antrian / spool yang belum masuk DB
+- producer_rows_rejected_total      : titik yang ditolak DB dan dibuang
+- producer_rows_dropped_total, producer_spool_bytes,
+  producer_replay_lag_seconds       : khusus SpoolWriter
+Per scheduler:
+- producer_tick_lag_seconds         : keterlambatan tick terhadap jadwal (jam nyata)
+
+Counter / gauge writer dibaca langsung dari atribut writer saat scrape, jadi jalur
+write() tidak bertambah beban. Paket prometheus-client opsional: tanpa paket,
+metrik jadi no-op dan --metrics-port ditolak.
+"""
+
+import os
+
+try:
+    from prometheus_client import Histogram, start_http_server
+    from prometheus_client.core import REGISTRY, CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # opsional: producer tetap jalan tanpa metrik
+    Histogram = start_http_server = None
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (nama metrik, atribut writer, dokumentasi)
+_COUNTERS = (
+    ("producer_rows_written", "rows_written", "Titik yang sudah masuk Postgres"),
+    ("producer_flushes", "flushes", "Batch yang berhasil di-flush"),
+    ("producer_flush_errors", "errors", "Flush yang gagal (di-retry)"),
+    ("producer_rows_rejected", "rejected", "Titik yang ditolak DB dan dibuang"),
+)
+_GAUGES = (
+    ("producer_pending_rows", "pending", "Titik yang belum masuk Postgres"),
+    ("producer_replay_lag_seconds", "lag_seconds", "Umur titik tertua di batch terakhir yang di-replay"),
+)
+
+
+class _Noop:
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, value):
+        pass
+
+
+def _histogram(name, doc, labels):
+    if Histogram is None:
+        return _Noop()
+    return Histogram(name, doc, labels, buckets=LATENCY_BUCKETS)
+
+
+FLUSH_SECONDS = _histogram("producer_flush_duration_seconds", "Waktu tulis + commit satu batch", ("writer",))
+TICK_LAG = _histogram("producer_tick_lag_seconds", "Keterlambatan tick terhadap jadwal", ("producer",))
+
+_writers = {}
+
+
+class _WriterCollector:
+    def collect(self):
+        writers = list(_writers.items())
+        for name, attr, doc in _COUNTERS:
+            family = CounterMetricFamily(name, doc, labels=["writer"])
+            for label, w in writers:
+                if hasattr(w, attr):
+                    family.add_metric([label], getattr(w, attr))
+            yield family
+        for name, attr, doc in _GAUGES:
+            family = GaugeMetricFamily(name, doc, labels=["writer"])
+            for label, w in writers:
+                if hasattr(w, attr):
+                    family.add_metric([label], getattr(w, attr))
+            yield family
+        dropped = CounterMetricFamily("producer_rows_dropped", "Titik dibuang karena spool penuh",
+                                      labels=["writer"])
+        disk = GaugeMetricFamily("producer_spool_bytes", "Ukuran spool di disk", labels=["writer"])
+        for label, w in writers:
+            spool = getattr(w, "spool", None)
+            if spool is not None:
+                dropped.add_metric([label], spool.dropped)
+                disk.add_metric([label], spool.disk_bytes)
+        yield dropped
+        yield disk
+
+
+if Histogram is not None:
+    REGISTRY.register(_WriterCollector())
+
+
+def register_writer(writer):
+    _writers[writer.name] = writer
+
+
+def unregister_writer(writer):
+    if _writers.get(writer.name) is writer:
+        del _writers[writer.name]
+
+
+def add_metrics_args(p):
+    g = p.add_argument_group("metrik")
+    g.add_argument("--metrics-port", type=int, default=int(os.getenv("PRODUCER_METRICS_PORT", "0")),
+                   help="port HTTP untuk /metrics Prometheus, 0 = mati (default: env PRODUCER_METRICS_PORT)")
+    return p
+
+
+def start_metrics_server(port, addr="0.0.0.0"):
+    """Jalankan endpoint /metrics di thread background (port 0 = tidak dijalankan)."""
+    if not port:
+        return
+    if start_http_server is None:
+        raise SystemExit("--metrics-port butuh paket prometheus-client (pip install prometheus-client)")
+    start_http_server(port, addr)
@@ -0,0 +1,454 @@
+# simulators/spool.py
+"""
+Spool lokal (write-ahead, memory-mapped) untuk producer posisi.
+
+Producer menulis titik ke spool di disk dulu (append ke mmap, tanpa menunggu
+DB); thread drainer me-replay isi spool ke Postgres per batch (COPY), urut
+sesuai urutan tulis. Kalau Postgres mati, producer tetap jalan dan titik
+menumpuk di spool sampai DB kembali.
+
+Layout direktori:
+  000000000001.seg ...  segmen ukuran tetap (di-prealokasi lalu di-mmap)
+  cursor                "seq offset" record pertama yang belum di-replay
+  lock                  flock: satu proses per direktori spool
+  rejected.jsonl        titik yang ditolak DB (mis. vehicle_id tidak dikenal)
+
+Record: header <panjang u32, crc32 u32> + payload JSON. Panjang 0 = akhir data
+di segmen; CRC yang tidak cocok (tulis terpotong saat crash) juga dianggap akhir.
+
+Ukuran disk dibatasi max_bytes (jumlah segmen x segment_bytes). Kalau penuh:
+- drop-oldest: segmen tertua yang belum di-replay dibuang (dihitung di dropped)
+- block      : write() menunggu sampai drainer membebaskan segmen
+"""
+
+import os
+import json
+import mmap
+import time
+import fcntl
+import struct
+import threading
+import zlib
+from datetime import datetime
+
+import psycopg2
+
+from batch_writer import write_batch
+from producer_metrics import FLUSH_SECONDS, register_writer, unregister_writer
+
+HEADER = struct.Struct("<II")  # panjang payload, crc32 payload
+SEGMENT_SUFFIX = ".seg"
+
+
+class Spool:
+    def __init__(self, directory, segment_bytes=16 << 20, max_bytes=512 << 20, on_full="drop-oldest"):
+        if on_full not in ("drop-oldest", "block"):
+            raise ValueError("on_full harus 'drop-oldest' atau 'block'")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max(2, max_bytes // segment_bytes)
+        self.on_full = on_full
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock_file = open(os.path.join(directory, "lock"), "a+")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(f"spool {directory} sedang dipakai proses lain")
+
+        self._cond = threading.Condition()
+        self._counts = {}       # seq -> jumlah record yang belum di-replay
+        self._rmap = None       # (seq, mmap) segmen lama yang sedang dibaca
+        self.appended = 0
+        self.dropped = 0        # record yang dibuang karena spool penuh
+        self.corrupt = 0        # segmen yang berakhir dengan record rusak
+
+        self._cseq, self._coff = self._load_cursor()
+        segments = sorted(
+            int(f[:-len(SEGMENT_SUFFIX)]) for f in os.listdir(directory) if f.endswith(SEGMENT_SUFFIX)
+        )
+        for seq in segments:
+            if seq < self._cseq:
+                os.remove(self._segment_path(seq))  # sudah di-replay sebelum restart
+        segments = [seq for seq in segments if seq >= self._cseq]
+        if not segments:
+            segments = [self._cseq]
+            self._create_segment(self._cseq)
+        elif segments[0] > self._cseq:
+            self._cseq, self._coff = segments[0], 0
+
+        self._segments = segments
+        for seq in segments[:-1]:
+            with open(self._segment_path(seq), "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = self._coff if seq == self._cseq else 0
+                self._counts[seq], _ = self._scan(mm, start, len(mm))
+        self._open_active(segments[-1])
+
+    # ---------- file ----------
+    def _segment_path(self, seq):
+        return os.path.join(self.directory, "%012d%s" % (seq, SEGMENT_SUFFIX))
+
+    def _load_cursor(self):
+        try:
+            with open(os.path.join(self.directory, "cursor")) as f:
+                seq, off = f.read().split()
+                return int(seq), int(off)
+        except (FileNotFoundError, ValueError):
+            return 1, 0
+
+    def _save_cursor(self):
+        path = os.path.join(self.directory, "cursor")
+        with open(path + ".tmp", "w") as f:
+            f.write(f"{self._cseq} {self._coff}\n")
+        os.replace(path + ".tmp", path)
+
+    def _create_segment(self, seq):
+        with open(self._segment_path(seq), "wb") as f:
+            f.truncate(self.segment_bytes)
+
+    def _open_active(self, seq):
+        self._wfile = open(self._segment_path(seq), "r+b")
+        if os.fstat(self._wfile.fileno()).st_size < self.segment_bytes:
+            self._wfile.truncate(self.segment_bytes)
+        self._wmap = mmap.mmap(self._wfile.fileno(), 0)
+        self._wseq = seq
+        start = self._coff if seq == self._cseq else 0
+        self._counts[seq], self._woff = self._scan(self._wmap, start, len(self._wmap))
+
+    def _scan(self, mm, offset, limit):
+        """Hitung record valid mulai offset. Return (jumlah, offset akhir)."""
+        n = 0
+        while True:
+            payload, nxt = self._record_at(mm, offset, limit)
+            if payload is None:
+                return n, offset
+            n += 1
+            offset = nxt
+
+    def _record_at(self, mm, offset, limit):
+        """Return (payload, offset berikutnya) atau (None, offset) kalau tidak ada record valid."""
+        if offset + HEADER.size > limit:
+            return None, offset
+        length, crc = HEADER.unpack_from(mm, offset)
+        end = offset + HEADER.size + length
+        if length == 0 or end > limit:
+            return None, offset
+        payload = mm[offset + HEADER.size:end]
+        if zlib.crc32(payload) != crc:
+            self.corrupt += 1
+            return None, offset
+        return payload, end
+
+    def _remove_segment(self, seq):
+        if self._rmap is not None and self._rmap[0] == seq:
+            self._rmap[1].close()
+            self._rmap = None
+        self._segments.remove(seq)
+        self._counts.pop(seq, None)
+        os.remove(self._segment_path(seq))
+
+    # ---------- tulis ----------
+    def append(self, payload):
+        """Tambahkan satu record (bytes). Tidak pernah menunggu DB."""
+        need = HEADER.size + len(payload)
+        if need > self.segment_bytes:
+            raise ValueError("record lebih besar dari segmen spool")
+        with self._cond:
+            if self._woff + need > self.segment_bytes:
+                self._rollover()
+            HEADER.pack_into(self._wmap, self._woff, len(payload), zlib.crc32(payload))
+            self._wmap[self._woff + HEADER.size:self._woff + need] = payload
+            self._woff += need
+            self._counts[self._wseq] += 1
+            self.appended += 1
+            self._cond.notify_all()
+
+    def _rollover(self):
+        while len(self._segments) >= self.max_segments:
+            if self.on_full == "block":
+                self._cond.wait()
+                continue
+            oldest = self._segments[0]
+            self.dropped += self._counts.get(oldest, 0)
+            self._remove_segment(oldest)
+            self._cseq, self._coff = self._segments[0], 0
+            self._save_cursor()
+        self._wmap.flush()
+        self._wmap.close()
+        self._wfile.close()
+        seq = self._wseq + 1
+        self._create_segment(seq)
+        self._segments.append(seq)
+        self._open_active(seq)
+
+    def sync(self):
+        """Paksa halaman mmap segmen aktif ke disk (tahan crash OS, bukan cuma crash proses)."""
+        with self._cond:
+            self._wmap.flush()
+
+    # ---------- baca (drainer) ----------
+    @property
+    def pending(self):
+        # dibaca dari thread lain (laporan, metrik); _counts berubah saat rollover / ack
+        with self._cond:
+            return sum(self._counts.values())
+
+    @property
+    def disk_bytes(self):
+        return len(self._segments) * self.segment_bytes
+
+    def wait(self, min_records, timeout):
+        """Tunggu sampai ada >= min_records record tertunda atau timeout. Return jumlah tertunda."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self.pending < min_records:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            return self.pending
+
+    def peek(self, max_records):
+        """
+        Baca sampai max_records record dari cursor tanpa memajukannya.
+        Return (list payload, list posisi akhir tiap record) untuk ack().
+        """
+        out, ends = [], []
+        with self._cond:
+            seq, off = self._cseq, self._coff
+            while len(out) < max_records:
+                if seq == self._wseq:
+                    mm, limit = self._wmap, self._woff
+                else:
+                    mm = self._read_map(seq)
+                    limit = len(mm)
+                payload, nxt = self._record_at(mm, off, limit)
+                if payload is not None:
+                    out.append(payload)
+                    off = nxt
+                    ends.append((seq, off))
+                    continue
+                if seq == self._wseq:
+                    break
+                # akhir segmen lama -> lanjut ke segmen berikutnya
+                seq, off = self._segments[self._segments.index(seq) + 1], 0
+            return out, ends
+
+    def _read_map(self, seq):
+        if self._rmap is None or self._rmap[0] != seq:
+            if self._rmap is not None:
+                self._rmap[1].close()
+            with open(self._segment_path(seq), "rb") as f:
+                self._rmap = (seq, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return self._rmap[1]
+
+    def ack(self, ends):
+        """
+        Tandai record (posisi akhir dari peek(), urut) sudah di-replay; segmen lama yang
+        habis dihapus. Record di segmen yang sudah dibuang drop-oldest tidak dihitung dua kali.
+        """
+        if not ends:
+            return
+        seq, off = ends[-1]
+        with self._cond:
+            cursor = (self._cseq, self._coff)
+            if (seq, off) <= cursor:
+                return  # segmen sudah dibuang (drop-oldest) saat batch ini ditulis
+            # record di segmen terakhir yang belum di-ack; segmen sebelumnya habis seluruhnya
+            n = sum(1 for e in ends if e[0] == seq and e > cursor)
+            while self._segments[0] < seq:
+                self._remove_segment(self._segments[0])
+            self._counts[seq] = max(0, self._counts[seq] - n)
+            self._cseq, self._coff = seq, off
+            self._save_cursor()
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._wmap.flush()
+            self._wmap.close()
+            self._wfile.close()
+            if self._rmap is not None:
+                self._rmap[1].close()
+                self._rmap = None
+        fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        self._lock_file.close()
+
+
+# ===== Writer: producer -> spool -> drainer -> Postgres =====
+def encode_row(row):
+    vehicle_id, lat, lon, sog, cog, heading, status, ts = row
+    return json.dumps([vehicle_id, lat, lon, sog, cog, heading, status, ts.isoformat()]).encode()
+
+
+def decode_row(payload):
+    row = json.loads(payload)
+    row[-1] = datetime.fromisoformat(row[-1])
+    return tuple(row)
+
+
+class SpoolWriter:
+    """Pengganti BatchWriter: write() ke spool, thread drainer yang menulis ke Postgres."""
+
+    def __init__(self, connect, directory, batch_size=500, flush_interval=1.0, method="copy",
+                 stats_interval=10.0, retry_delay=1.0, segment_bytes=16 << 20, max_bytes=512 << 20,
+                 on_full="drop-oldest", sync_interval=1.0, name="writer"):
+        if method not in ("copy", "values"):
+            raise ValueError("method harus 'copy' atau 'values'")
+        self.connect = connect
+        self.name = name                     # label metrik (lihat producer_metrics.py)
+        self.spool = Spool(directory, segment_bytes, max_bytes, on_full)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.method = method
+        self.stats_interval = stats_interval
+        self.retry_delay = retry_delay
+        self.sync_interval = sync_interval   # detik antar msync segmen aktif
+        self._stop = threading.Event()
+        self._thread = None
+        self._conn = None
+        # statistik replay
+        self.rows_written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.rejected = 0
+        self.lag_seconds = 0.0      # umur titik tertua di batch terakhir saat berhasil ditulis
+        self._started_at = None
+        self._window = (time.monotonic(), 0)  # (awal interval laporan, rows_written saat itu)
+
+    # ---------- API producer (sama dengan BatchWriter) ----------
+    def start(self):
+        self._started_at = time.monotonic()
+        self._window = (self._started_at, 0)
+        self._thread = threading.Thread(target=self._run, name="spool-drainer", daemon=True)
+        self._thread.start()
+        if self.spool.pending:
+            print(f"[{datetime.now()}] spool: {self.spool.pending} titik tertunda dari run sebelumnya")
+        register_writer(self)
+        return self
+
+    def write(self, vehicle_id, lat, lon, sog, cog, heading, status, ts=None):
+        """Tulis satu titik ke spool (tidak menunggu DB)."""
+        if ts is None:
+            ts = datetime.now()
+        self.spool.append(encode_row((vehicle_id, lat, lon, sog, cog, heading, status, ts)))
+
+    def flush(self, timeout=None):
+        """Tunggu sampai isi spool habis di-replay. Return False kalau timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.spool.pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def close(self, timeout=30.0):
+        """Replay sisa spool (selama DB bisa), lalu berhenti. Sisa yang gagal tetap di disk."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._report()
+        unregister_writer(self)
+        self.spool.close()
+
+    @property
+    def pending(self):
+        return self.spool.pending
+
+    def rows_per_sec(self):
+        if not self._started_at:
+            return 0.0
+        elapsed = time.monotonic() - self._started_at
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+
+    # ---------- thread drainer ----------
+    def _run(self):
+        next_report = time.monotonic() + self.stats_interval if self.stats_interval else None
+        next_sync = time.monotonic() + self.sync_interval
+        while True:
+            stopping = self._stop.is_set()
+            if not stopping:
+                self.spool.wait(self.batch_size, self.flush_interval)
+            payloads, ends = self.spool.peek(self.batch_size)
+            if payloads:
+                if not self._replay(payloads, ends) and stopping:
+                    break  # DB tidak bisa saat shutdown: sisa tetap di spool
+            elif stopping:
+                break
+
+            now = time.monotonic()
+            if now >= next_sync:
+                self.spool.sync()
+                next_sync = now + self.sync_interval
+            if next_report is not None and now >= next_report:
+                self._report()
+                next_report = now + self.stats_interval
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _replay(self, payloads, ends):
+        batch = [decode_row(p) for p in payloads]
+        try:
+            if self._conn is None or self._conn.closed:
+                self._conn = self.connect()
+            try:
+                t0 = time.perf_counter()
+                write_batch(self._conn, batch, self.method)
+                self._conn.commit()
+                FLUSH_SECONDS.labels(self.name).observe(time.perf_counter() - t0)
+            except (psycopg2.IntegrityError, psycopg2.DataError):
+                # bukan masalah koneksi: pisahkan baris yang ditolak supaya spool tidak macet
+                self._conn.rollback()
+                self._write_rows_individually(batch, ends)
+            else:
+                self.spool.ack(ends)
+                self.rows_written += len(batch)
+        except psycopg2.Error as e:
+            self.errors += 1
+            print(f"[{datetime.now()}] spool: replay {len(batch)} rows gagal ({e}); "
+                  f"pending={self.spool.pending}, retry...")
+            try:
+                if self._conn is not None:
+                    self._conn.close()
+            except psycopg2.Error:
+                pass
+            self._conn = None
+            self._stop.wait(self.retry_delay)
+            return False
+
+        self.flushes += 1
+        self.lag_seconds = max(0.0, (datetime.now() - batch[0][-1]).total_seconds())
+        return True
+
+    def _write_rows_individually(self, batch, ends):
+        """
+        Tulis per baris; yang ditolak dicatat di rejected.jsonl. Tiap baris di-ack begitu
+        commit / ditolak, jadi kalau koneksi putus di tengah (error dilempar ke _replay)
+        replay berikutnya mulai dari baris yang belum tertulis, bukan mengulang batch.
+        """
+        for row, end in zip(batch, ends):
+            try:
+                write_batch(self._conn, [row], "values")
+                self._conn.commit()
+                self.rows_written += 1
+            except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+                self._conn.rollback()
+                self.rejected += 1
+                with open(os.path.join(self.spool.directory, "rejected.jsonl"), "a") as f:
+                    f.write(json.dumps({"row": json.loads(encode_row(row)), "error": str(e).strip()}) + "\n")
+            self.spool.ack([end])
+
+    def _report(self):
+        now = time.monotonic()
+        start, rows = self._window
+        rate = (self.rows_written - rows) / (now - start) if now > start else 0.0
+        self._window = (now, self.rows_written)
+        print(f"[{datetime.now()}] spool: replayed={self.rows_written} rate={rate:.1f} rows/s "
+              f"avg={self.rows_per_sec():.1f} rows/s pending={self.spool.pending} "
+              f"disk={self.spool.disk_bytes >> 20}MB lag={self.lag_seconds:.1f}s "
+              f"dropped={self.spool.dropped} rejected={self.rejected} errors={self.errors}")
@@ -0,0 +1,72 @@
+# tests/test_app_db_streams.py
+"""Endpoint stream app_db (SSE / WebSocket): subscription tidak bocor saat error."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("asyncpg")
+httpx = pytest.importorskip("httpx")
+import app_db
+from fastapi import FastAPI
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(app_db.router)
+    return app
+
+
+def test_geofence_stream_backlog_error_closes_subscription(app, monkeypatch):
+    async def max_id():
+        return 10
+
+    def broken_begin():
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(app_db, "_geofence_event_max_id", max_id)
+    monkeypatch.setattr(app_db.async_db, "begin", broken_begin)
+    before = app_db.geofence_event_bus.subscriber_count
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            return await client.get("/geofences/events/stream", params={"since_id": 0})
+
+    resp = asyncio.run(scenario())
+    assert resp.json() == {"error": "db down"}
+    assert app_db.geofence_event_bus.subscriber_count == before
+
+
+@pytest.mark.parametrize("message, reason", [
+    ([], "pesan harus objek JSON"),
+    ("x", "pesan harus objek JSON"),
+    ({"vehicle_ids": "abc"}, "vehicle_ids harus list string"),
+    ({"vehicle_ids": [1, 2]}, "vehicle_ids harus list string"),
+])
+def test_ws_bad_filter_message_closes_with_1003(app, monkeypatch, message, reason):
+    from starlette.testclient import TestClient
+
+    async def open_subscription(vehicle_id, bbox):
+        return app_db.position_bus.subscribe(vehicle_id, None), []
+
+    monkeypatch.setattr(app_db, "_open_subscription", open_subscription)
+    before = app_db.position_bus.subscriber_count
+    with TestClient(app) as client, client.websocket_connect("/ws/positions") as ws:
+        assert ws.receive_json() == {"type": "snapshot", "data": []}
+        ws.send_json(message)
+        assert ws.receive() == {"type": "websocket.close", "code": 1003, "reason": reason}
+    assert app_db.position_bus.subscriber_count == before
+
+
+def test_ws_valid_filter_resends_snapshot(app, monkeypatch):
+    from starlette.testclient import TestClient
+
+    async def open_subscription(vehicle_id, bbox):
+        return app_db.position_bus.subscribe(vehicle_id, None), []
+
+    monkeypatch.setattr(app_db, "_open_subscription", open_subscription)
+    with TestClient(app) as client, client.websocket_connect("/ws/positions") as ws:
+        ws.receive_json()
+        ws.send_json({"vehicle_ids": ["PYTEST01"]})
+        assert ws.receive_json()["type"] == "snapshot"
@@ -0,0 +1,33 @@
+# tests/test_batch_writer.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import PREFIX, connect
+from batch_writer import BatchWriter
+
+
+def _count(pg, vehicle_id=None):
+    with pg.cursor() as cur:
+        cur.execute("SELECT count(*) FROM positions WHERE vehicle_id LIKE %s", (vehicle_id or PREFIX + "%",))
+        n = cur.fetchone()[0]
+    pg.rollback()
+    return n
+
+
+@pytest.mark.parametrize("method", ["copy", "values"])
+def test_bad_row_is_dropped_not_retried(pg, vehicles, method):
+    """Satu baris dengan vehicle_id tidak dikenal tidak boleh memacetkan writer."""
+    writer = BatchWriter(connect, batch_size=100, flush_interval=0.1, method=method,
+                         stats_interval=0, retry_delay=0.05).start()
+    t0 = datetime.now()
+    for i in range(50):
+        vid = PREFIX + "UNKNOWN" if i == 17 else vehicles[i % len(vehicles)]
+        writer.write(vid, -6.2, 106.8, 10.0, 90.0, 90.0, "Moving", t0 + timedelta(seconds=i))
+    assert writer.flush(timeout=10)
+    writer.close()
+
+    assert writer.rejected == 1
+    assert writer.rows_written == 49
+    assert writer.errors == 0
+    assert _count(pg) == 49
@@ -0,0 +1,134 @@
+# tests/test_export_analytics.py
+"""export_parquet.py -> analytics.py / app_analytics.py pada satu hari kecil yang di-seed."""
+import asyncio
+import json
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+import analytics
+import export_parquet
+from conftest import PREFIX
+from geo import haversine_km
+
+DAY = date(2099, 2, 1)   # jauh di depan: masuk positions_default, tidak bentrok dengan data dev
+T0 = datetime(2099, 2, 1)
+ODD_ID = PREFIX + "/04 x"    # perlu di-URL-encode di nama direktori
+
+# (menit, lon, sog, status) untuk vehicles[0]; gap 27 menit antara 00:03 dan 00:30
+TRACK = [
+    (0, 0.00, 10.0, "Moving"),
+    (1, 0.01, 10.0, "Moving"),
+    (2, 0.02, 0.0, None),        # status kosong -> status_from_speed(0) = Stopped
+    (3, 0.02, 0.0, "Idle"),
+    (30, 0.03, 0.0, "Idle"),
+    (31, 0.03, 0.0, "Idle"),
+]
+
+
+@pytest.fixture
+def seeded(pg, vehicles):
+    with pg.cursor() as cur:
+        cur.execute("INSERT INTO vehicles (vehicle_id) VALUES (%s)", (ODD_ID,))
+        for minute, lon, sog, status in TRACK:
+            cur.execute("INSERT INTO positions (vehicle_id, lat, lon, sog, status, ts) VALUES (%s, 0, %s, %s, %s, %s)",
+                        (vehicles[0], lon, sog, status, T0 + timedelta(minutes=minute)))
+        cur.execute("INSERT INTO positions (vehicle_id, lat, lon, sog, status, ts) VALUES (%s, 1, 1, 3, 'Idle', %s)",
+                    (ODD_ID, T0 + timedelta(hours=5)))
+        # hari berikutnya: di luar export satu hari
+        cur.execute("INSERT INTO positions (vehicle_id, lat, lon, sog, status, ts) VALUES (%s, 0, 0, 1, 'Idle', %s)",
+                    (vehicles[0], T0 + timedelta(days=1)))
+    pg.commit()
+    yield vehicles[0]
+    pg.rollback()
+    with pg.cursor() as cur:
+        cur.execute("DELETE FROM positions WHERE ts >= %s AND ts < %s", (T0, T0 + timedelta(days=2)))
+    pg.commit()
+
+
+@pytest.fixture
+def engine():
+    from sqlalchemy import create_engine
+
+    engine = create_engine(os.environ["DATABASE_URL"], future=True)
+    yield engine
+    engine.dispose()
+
+
+def test_export_layout_and_skip(seeded, engine, pg, tmp_path):
+    root = str(tmp_path)
+    assert export_parquet.export_range(engine, root, DAY, DAY, chunk_rows=4) == 7
+
+    day_path = os.path.join(root, "day=2099-02-01")
+    assert sorted(os.listdir(root)) == ["day=2099-02-01"]   # tidak ada .tmp-day tersisa
+    assert sorted(os.listdir(day_path)) == ["_SUCCESS", "vehicle_id=PYTEST%2F04%20x", f"vehicle_id={seeded}"]
+    with open(os.path.join(day_path, "_SUCCESS")) as f:
+        assert {k: v for k, v in json.load(f).items() if k != "exported_at"} == {"rows": 7, "vehicles": 2}
+
+    f = pq.ParquetFile(os.path.join(day_path, f"vehicle_id={seeded}", "part-0.parquet"))
+    assert f.schema_arrow.names == export_parquet.COLUMNS
+    assert f.num_row_groups == 2                               # chunk_rows=4 -> 4 + 2
+    table = f.read()
+    assert table.column("ts").to_pylist() == [T0 + timedelta(minutes=m) for m, *_ in TRACK]
+    assert table.column("status").to_pylist() == [s for *_, s in TRACK]
+
+    # hari yang sudah punya _SUCCESS dilewati, kecuali --force
+    with pg.cursor() as cur:
+        cur.execute("INSERT INTO positions (vehicle_id, lat, lon, ts) VALUES (%s, 0, 0, %s)",
+                    (seeded, T0 + timedelta(hours=6)))
+    pg.commit()
+    assert export_parquet.export_range(engine, root, DAY, DAY) == 0
+    assert pq.read_table(os.path.join(day_path, f"vehicle_id={seeded}")).num_rows == 6
+    assert export_parquet.export_range(engine, root, DAY, DAY, force=True) == 8
+    assert pq.read_table(os.path.join(day_path, f"vehicle_id={seeded}")).num_rows == 7
+
+
+def test_vehicle_summaries(seeded, engine, tmp_path):
+    root = str(tmp_path)
+    export_parquet.export_range(engine, root, DAY, DAY)
+    os.makedirs(os.path.join(root, "day=2099-02-02", f"vehicle_id={seeded}"))   # tanpa _SUCCESS: diabaikan
+
+    step_km = haversine_km(0, 0, 0, 0.01)
+    [s] = analytics.vehicle_summaries(root, [seeded], max_gap_seconds=900)
+    assert s["points"] == 6
+    assert s["first_ts"] == T0.isoformat()
+    assert s["last_ts"] == (T0 + timedelta(minutes=31)).isoformat()
+    assert s["distance_km"] == round(3 * step_km, 3)           # lompatan melewati gap ikut jarak
+    assert s["tracked_seconds"] == 240.0
+    assert s["gap_seconds"] == 27 * 60.0
+    assert s["avg_speed_kmh"] == round(2 * step_km / (240 / 3600.0), 3)   # ...tapi tidak ikut kecepatan
+    assert s["avg_sog"] == round(20.0 / 6, 3)
+    assert s["time_in_status"] == {"Idle": 60.0, "Moving": 120.0, "Stopped": 60.0}
+
+    # window [00:30, 01:00): hanya dua titik terakhir
+    [s] = analytics.vehicle_summaries(root, [seeded], T0 + timedelta(minutes=30), T0 + timedelta(hours=1))
+    assert (s["points"], s["tracked_seconds"], s["time_in_status"]) == (2, 60.0, {"Idle": 60.0})
+
+    assert [r["vehicle_id"] for r in analytics.vehicle_summaries(root)] == [ODD_ID, seeded]
+
+
+def test_analytics_router(seeded, engine, tmp_path, monkeypatch):
+    httpx = pytest.importorskip("httpx")
+    import app_analytics
+    from fastapi import FastAPI
+
+    export_parquet.export_range(engine, str(tmp_path), DAY, DAY)
+    monkeypatch.setattr(app_analytics, "EXPORT_ROOT", str(tmp_path))
+    app = FastAPI()
+    app.include_router(app_analytics.router)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+            one = await client.get(f"/analytics/vehicles/{seeded}",
+                                   params={"from": "2099-02-01T00:30:00", "to": "2099-02-01T01:00:00"})
+            missing = await client.get("/analytics/vehicles/NOPE")
+            bad = await client.get("/analytics/vehicles",
+                                   params={"from": "2099-02-02T00:00:00", "to": "2099-02-01T00:00:00"})
+            return one, missing, bad
+
+    one, missing, bad = asyncio.run(scenario())
+    assert one.status_code == 200 and one.json()["points"] == 2
+    assert missing.status_code == 404
+    assert bad.status_code == 400
@@ -0,0 +1,64 @@
+# tests/test_gateway_writer.py
+"""GatewayWriter: hanya error sementara yang di-retry, penolakan membelah batch."""
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from gateway_writer import GatewayWriter
+
+
+class _Gateway(BaseHTTPRequestHandler):
+    """POST /positions: 503 sekali, lalu 400 kalau ada vehicle_id BAD di batch."""
+
+    def do_POST(self):
+        srv = self.server
+        points = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with srv.lock:
+            srv.requests += 1
+            if not srv.busy_sent:
+                srv.busy_sent = True
+                status, body = 503, {"error": "antrian writer penuh"}
+            elif any(p["vehicle_id"] == "BAD" for p in points):
+                status, body = 400, {"error": "titik tidak valid"}
+            else:
+                srv.received += [p["vehicle_id"] for p in points]
+                status, body = 200, {"accepted": len(points), "rejected": 0, "errors": []}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gateway():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Gateway)
+    srv.lock = threading.Lock()
+    srv.requests, srv.received, srv.busy_sent = 0, [], False
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_rejected_rows_are_isolated_and_dropped(gateway):
+    url = "http://127.0.0.1:%d" % gateway.server_address[1]
+    writer = GatewayWriter(url, batch_size=100, flush_interval=0.05, stats_interval=0, retry_delay=0.01)
+    ids = ["V%d" % i for i in range(16)]
+    ids[5] = ids[11] = "BAD"
+    for vid in ids:
+        writer.write(vid, -6.2, 106.8, 5.0, None, None, "Moving", datetime.now())
+    writer.start()
+    assert writer.flush(timeout=10)
+    writer.close()
+
+    assert gateway.received == [v for v in ids if v != "BAD"]   # tiap titik tepat sekali, urut
+    assert writer.rejected == 2
+    assert writer.rows_written == 14
+    assert writer.errors == 1                                   # hanya 503 yang di-retry
@@ -0,0 +1,112 @@
+# tests/test_geofence_worker.py
+"""GeofenceWorker terhadap posisi yang commit tidak urut id (writer paralel)."""
+import os
+import time
+
+import pytest
+
+from conftest import PREFIX, connect
+
+
+@pytest.fixture
+def worker_env(pg, vehicles):
+    sqlalchemy = pytest.importorskip("sqlalchemy")
+    with pg.cursor() as cur:
+        cur.execute("""
+            INSERT INTO geofences (name, kind, center_lat, center_lon, radius_km)
+            VALUES ('PYTEST harbour', 'circle', -6.2, 106.8, 5) RETURNING geofence_id
+        """)
+        fence_id = cur.fetchone()[0]
+        # cursor mulai dari sekarang: jangan proses riwayat DB dev
+        cur.execute("""
+            INSERT INTO geofence_cursor (id, last_position_id, gaps)
+            SELECT 1, COALESCE(max(id), 0), '[]' FROM positions
+            ON CONFLICT (id) DO UPDATE SET last_position_id = EXCLUDED.last_position_id, gaps = '[]'
+        """)
+    pg.commit()
+    engine = sqlalchemy.create_engine(os.environ["DATABASE_URL"], future=True)
+    yield engine, fence_id
+    engine.dispose()
+    pg.rollback()
+    with pg.cursor() as cur:
+        cur.execute("DELETE FROM geofences WHERE geofence_id = %s", (fence_id,))
+        cur.execute("DELETE FROM geofence_events WHERE vehicle_id LIKE %s", (PREFIX + "%",))
+        cur.execute("DELETE FROM geofence_vehicle_state WHERE vehicle_id LIKE %s", (PREFIX + "%",))
+    pg.commit()
+
+
+def _insert(conn, vehicle_id):
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO positions (vehicle_id, lat, lon, sog, status, ts) "
+                    "VALUES (%s, -6.2, 106.8, 5, 'Moving', now()) RETURNING id", (vehicle_id,))
+        return cur.fetchone()[0]
+
+
+def _enters(pg, fence_id):
+    with pg.cursor() as cur:
+        cur.execute("SELECT vehicle_id, count(*) FROM geofence_events "
+                    "WHERE geofence_id = %s AND event = 'enter' GROUP BY vehicle_id", (fence_id,))
+        out = dict(cur.fetchall())
+    pg.rollback()
+    return out
+
+
+def test_late_commit_with_lower_id_is_not_lost(pg, vehicles, worker_env):
+    from geofence_worker import GeofenceWorker
+
+    engine, fence_id = worker_env
+    slow, fast = connect(), connect()
+    try:
+        low = _insert(slow, vehicles[0])            # id kecil, belum commit
+        high = _insert(fast, vehicles[1])
+        fast.commit()
+        assert low < high
+
+        worker = GeofenceWorker(engine)
+        worker.drain()
+        assert _enters(pg, fence_id) == {vehicles[1]: 1}
+        assert worker.last_id == high
+        assert any(lo <= low <= hi for lo, hi, _ in worker.gaps)
+
+        slow.commit()
+        # restart: gap ikut tersimpan di geofence_cursor
+        worker = GeofenceWorker(engine)
+        worker.drain()
+        assert _enters(pg, fence_id) == {vehicles[0]: 1, vehicles[1]: 1}
+        assert not any(lo <= low <= hi for lo, hi, _ in worker.gaps)
+
+        worker.drain()
+        assert _enters(pg, fence_id) == {vehicles[0]: 1, vehicles[1]: 1}
+    finally:
+        slow.close()
+        fast.close()
+
+
+def test_rolled_back_gap_expires(pg, vehicles, worker_env, monkeypatch):
+    import geofence_worker
+
+    engine, _ = worker_env
+    aborted = connect()
+    try:
+        _insert(aborted, vehicles[0])
+        aborted.rollback()                          # id terpakai tapi tidak pernah commit
+    finally:
+        aborted.close()
+    _insert(pg, vehicles[1])
+    pg.commit()
+
+    worker = geofence_worker.GeofenceWorker(engine)
+    worker.drain()
+    assert len(worker.gaps) == 1
+    monkeypatch.setattr(geofence_worker, "GEOFENCE_GAP_SECONDS", 0.05)
+    time.sleep(0.1)
+    worker.drain()
+    assert worker.gaps == []
+
+
+def test_subtract_ids():
+    from geofence_worker import subtract_ids
+
+    gaps = [[10, 20, 1.0], [30, 30, 2.0]]
+    assert subtract_ids(gaps, [10, 15, 20, 30]) == [[11, 14, 1.0], [16, 19, 1.0]]
+    assert subtract_ids(gaps, []) == gaps
@@ -0,0 +1,72 @@
+# tests/test_ingest_gateway.py
+"""Antrian writer penuh tidak boleh memblok event loop gateway."""
+import asyncio
+import threading
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+ingest_gateway = pytest.importorskip("ingest_gateway")
+from batch_writer import BatchWriter
+
+
+def _point(vid):
+    return {"vehicle_id": vid, "lat": -6.2, "lon": 106.8}
+
+
+def _run(coro, timeout=5):
+    """Jalankan coro di thread lain: put() yang memblok akan membekukan loop, bukan pytest."""
+    out = {}
+    t = threading.Thread(target=lambda: out.update(result=asyncio.run(coro)), daemon=True)
+    t.start()
+    t.join(timeout)
+    assert not t.is_alive(), "event loop terblok"
+    return out["result"]
+
+
+@pytest.fixture
+def intake(monkeypatch):
+    # writer tidak di-start: antrian tidak pernah berkurang
+    writer = BatchWriter(connect=None, max_pending=5, stats_interval=0)
+    intake = ingest_gateway.Intake(writer, connect=None, auto_register=False)
+    intake.known = {"V1", "V2"}
+
+    async def slow_resolve(rows):
+        await asyncio.sleep(0.05)        # request lain lolos has_room() selama menunggu
+        return set()
+
+    monkeypatch.setattr(intake, "resolve", slow_resolve)
+    monkeypatch.setattr(ingest_gateway, "_intake", intake)
+    return intake
+
+
+def test_http_full_queue_returns_503_after_resolve(intake):
+    async def scenario():
+        transport = httpx.ASGITransport(app=ingest_gateway.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gw") as client:
+            body = [_point("V1")] * 3
+            return await asyncio.gather(*(client.post("/positions", json=body) for _ in range(2)))
+
+    codes = sorted(r.status_code for r in _run(scenario()))
+    assert codes == [200, 503]
+    assert intake.writer.pending == 3
+    assert intake.accepted == 3
+
+
+def test_udp_full_queue_counts_drops(intake):
+    async def scenario():
+        proto = ingest_gateway._UdpProtocol(intake)
+        v1 = b"$TRK,V1,-6.2,106.8,5,,,Moving,\n"
+        proto.datagram_received(v1 * 4, ("127.0.0.1", 9))
+        proto.datagram_received(v1 * 2, ("127.0.0.1", 9))       # tidak muat
+        intake.writer._queue.get_nowait()
+        intake.writer._queue.get_nowait()                        # sisa ruang 3
+        intake.known.discard("V2")
+        proto.datagram_received(b"$TRK,V2,-6.2,106.8,5,,,Moving,\n" * 3, ("127.0.0.1", 9))
+        proto.datagram_received(v1 * 2, ("127.0.0.1", 9))       # masuk selagi V2 di-resolve
+        await asyncio.sleep(0.1)                                 # _resolve_and_enqueue
+
+    _run(scenario())
+    assert intake.writer.pending == 4
+    assert intake.accepted == 6
+    assert intake.dropped == 5
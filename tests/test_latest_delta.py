@@ -0,0 +1,63 @@
+# tests/test_latest_delta.py
+"""Delta cache API (app_db._pull_latest_delta) terhadap commit yang tidak urut id."""
+import asyncio
+
+import pytest
+
+from conftest import connect
+
+
+def _insert(conn, vehicle_id, lat):
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO positions (vehicle_id, lat, lon, sog, status, ts) "
+                    "VALUES (%s, %s, 106.8, 5, 'Moving', now()) RETURNING id", (vehicle_id, lat))
+        return cur.fetchone()[0]
+
+
+def test_delta_sees_lower_id_committed_late(pg, vehicles):
+    pytest.importorskip("asyncpg")
+    import app_db
+
+    slow, fast = connect(), connect()
+
+    async def pull():
+        async with app_db.async_db.begin() as conn:
+            assert await app_db._pull_latest_delta(conn)
+
+    async def scenario():
+        try:
+            await app_db.refresh_latest_store(force_full=True)
+            sub = app_db.position_bus.subscribe(vehicles)
+
+            low = _insert(slow, vehicles[0], -6.1)     # id lebih kecil, belum commit
+            high = _insert(fast, vehicles[1], -6.2)
+            fast.commit()
+            assert low < high
+            await pull()
+            pos = {p["vehicle_id"]: p for p in app_db.latest_store.positions()}
+            assert pos[vehicles[1]]["lat"] == -6.2
+            assert vehicles[0] not in pos
+
+            slow.commit()                              # commit setelah cursor melewati `high`
+            await pull()
+            pos = {p["vehicle_id"]: p for p in app_db.latest_store.positions()}
+            assert pos[vehicles[0]]["lat"] == -6.1
+
+            # baris yang terbaca ulang tidak di-publish dua kali
+            await pull()
+            published = []
+            while True:
+                rows = await sub.get(timeout=0.01)
+                if not rows:
+                    break
+                published += [r["vehicle_id"] for r in rows]
+            assert sorted(published) == sorted(vehicles[:2])
+            sub.close()
+        finally:
+            await app_db.async_db.engine.dispose()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        slow.close()
+        fast.close()
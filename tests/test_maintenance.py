@@ -0,0 +1,103 @@
+# tests/test_maintenance.py
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import maintenance
+
+DAY = "2099-01-01"   # jauh di depan: tidak bentrok dengan partisi yang dibuat job maintenance
+PART = "positions_20990101"
+
+
+@pytest.fixture
+def future_rows(pg, vehicles):
+    """Baris 2099-01-01 (dua) dan 2099-01-03 (satu), semuanya jatuh ke positions_default."""
+    with pg.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {PART}")
+        cur.execute("""
+            INSERT INTO positions (vehicle_id, lat, lon, sog, status, ts) VALUES
+              (%(v)s, -6.2, 106.8, 5, 'Moving', '2099-01-01 10:00'),
+              (%(v)s, -6.3, 106.9, 5, 'Moving', '2099-01-01 23:59:59'),
+              (%(v)s, -6.4, 107.0, 5, 'Moving', '2099-01-03 08:00')
+        """, {"v": vehicles[0]})
+    pg.commit()
+    yield vehicles[0]
+    pg.rollback()
+    with pg.cursor() as cur:
+        cur.execute("DELETE FROM positions WHERE ts >= '2099-01-01'")
+        cur.execute(f"DROP TABLE IF EXISTS {PART}")
+    pg.commit()
+
+
+def _scalar(pg, sql, params=None):
+    with pg.cursor() as cur:
+        cur.execute(sql, params)
+        v = cur.fetchone()[0]
+    pg.rollback()
+    return v
+
+
+def test_ensure_partitions_moves_rows_out_of_default(pg, future_rows):
+    with pg.cursor() as cur:
+        cur.execute("SELECT positions_ensure_partitions(%s, 0, 'day')", (DAY,))
+        assert cur.fetchone()[0] == 1
+    pg.commit()
+
+    assert _scalar(pg, f"SELECT count(*) FROM {PART}") == 2
+    assert _scalar(pg, "SELECT count(*) FROM positions_default WHERE ts >= %s", (DAY,)) == 1
+    assert _scalar(pg, "SELECT count(*) FROM positions WHERE ts >= %s", (DAY,)) == 3
+    # partisi baru benar-benar terpasang: insert berikutnya masuk ke sana
+    with pg.cursor() as cur:
+        cur.execute("INSERT INTO positions (vehicle_id, lat, lon, ts) VALUES (%s, 0, 0, '2099-01-01 12:00')",
+                    (future_rows,))
+    pg.commit()
+    assert _scalar(pg, f"SELECT count(*) FROM {PART}") == 3
+    # idempotent
+    assert _scalar(pg, "SELECT positions_ensure_partitions(%s, 0, 'day')", (DAY,)) == 0
+
+
+def test_run_once_continues_after_failed_step(pg, monkeypatch):
+    from sqlalchemy import create_engine
+
+    engine = create_engine(os.environ["DATABASE_URL"], future=True)
+    monkeypatch.setattr(maintenance, "PARTITION_INTERVAL", "bogus")   # positions_ensure_partitions RAISE
+    monkeypatch.setattr(maintenance, "RETENTION_DAYS", 0)
+    calls = []
+    real_begin = engine.begin
+
+    def begin():
+        calls.append(1)
+        return real_begin()
+
+    monkeypatch.setattr(engine, "begin", begin)
+    try:
+        assert maintenance.run_once(engine) == ["partitions"]
+        assert len(calls) == 3   # rollup & late_rollups tetap jalan di transaksinya sendiri
+    finally:
+        engine.dispose()
+
+
+def test_late_rows_reach_rollups(pg, vehicles):
+    from sqlalchemy import create_engine
+
+    hour = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+    with pg.cursor() as cur:
+        cur.execute("""
+            INSERT INTO positions (vehicle_id, lat, lon, sog, status, ts) VALUES
+              (%(v)s, -6.2, 106.8, 4, 'Moving', %(h)s + interval '5 minutes'),
+              (%(v)s, -6.4, 107.0, 8, 'Moving', %(h)s + interval '50 minutes')
+        """, {"v": vehicles[1], "h": hour})
+    pg.commit()
+    assert _scalar(pg, "SELECT count(*) FROM positions_rollup_dirty WHERE bucket = %s", (hour,)) == 1
+
+    engine = create_engine(os.environ["DATABASE_URL"], future=True)
+    try:
+        assert "late_rollups" not in maintenance.run_once(engine)
+    finally:
+        engine.dispose()
+    assert _scalar(pg, "SELECT count(*) FROM positions_rollup_dirty WHERE bucket = %s", (hour,)) == 0
+    assert _scalar(pg, "SELECT n FROM positions_rollup_1h WHERE vehicle_id = %s AND bucket = %s",
+                   (vehicles[1], hour)) == 2
+    assert _scalar(pg, "SELECT sum(n) FROM positions_rollup_1m WHERE vehicle_id = %s AND bucket >= %s "
+                       "AND bucket < %s", (vehicles[1], hour, hour + timedelta(hours=1))) == 2
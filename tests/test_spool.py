@@ -0,0 +1,99 @@
+# tests/test_spool.py
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import PREFIX, connect
+from spool import Spool, SpoolWriter
+
+RECORD = b"x" * 92   # + header 8 byte = 100 byte -> 10 record per segmen 1 KiB
+
+
+def _actual(spool):
+    return len(spool.peek(10 ** 9)[0])
+
+
+def test_pending_after_drop_oldest_during_inflight_batch(tmp_path):
+    spool = Spool(str(tmp_path), segment_bytes=1024, max_bytes=3 * 1024)
+    for _ in range(15):
+        spool.append(RECORD)
+    payloads, ends = spool.peek(15)          # segmen 1 (10) + segmen 2 (5)
+    for _ in range(16):
+        spool.append(RECORD)                 # segmen 1 dibuang selagi batch "ditulis"
+    assert spool.dropped == 10
+    spool.ack(ends)
+    assert spool.pending == _actual(spool) == 16
+    spool.close()
+
+
+def test_pending_matches_contents_under_random_eviction(tmp_path):
+    rng = random.Random(7)
+    spool = Spool(str(tmp_path), segment_bytes=1024, max_bytes=4 * 1024)
+    inflight = None
+    for _ in range(2000):
+        op = rng.random()
+        if op < 0.9:
+            spool.append(RECORD[:rng.randint(1, len(RECORD))])
+        elif inflight is None:
+            inflight = spool.peek(rng.randint(1, 25))[1] or None
+        else:
+            spool.ack(inflight[:rng.randint(1, len(inflight))])
+            inflight = None
+        assert spool.pending == _actual(spool)
+    assert spool.dropped > 0
+    spool.close()
+    # cursor & hitungan tetap benar setelah dibuka ulang
+    spool = Spool(str(tmp_path), segment_bytes=1024, max_bytes=4 * 1024)
+    assert spool.pending == _actual(spool)
+    spool.close()
+
+
+class _DropOnCommit:
+    """Koneksi psycopg2 yang 'putus' (rollback + OperationalError) pada commit ke-n."""
+
+    def __init__(self, conn, fail_at):
+        self._conn = conn
+        self._commits = 0
+        self._fail_at = fail_at
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def commit(self):
+        self._commits += 1
+        if self._commits == self._fail_at:
+            import psycopg2
+            self._conn.rollback()
+            self._conn.close()
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self._conn.commit()
+
+
+def test_row_fallback_resumes_without_duplicates(pg, vehicles, tmp_path):
+    conns = []
+
+    def flaky_connect():
+        # koneksi pertama putus saat commit per-baris ke-5; berikutnya normal
+        conns.append(_DropOnCommit(connect(), 5) if not conns else connect())
+        return conns[-1]
+
+    writer = SpoolWriter(flaky_connect, str(tmp_path), batch_size=100, flush_interval=0.05,
+                         stats_interval=0, retry_delay=0.01)
+    t0 = datetime.now()
+    for i in range(10):
+        vid = PREFIX + "UNKNOWN" if i == 3 else vehicles[i % len(vehicles)]
+        writer.write(vid, -6.2, 106.8 + i * 1e-3, 5.0, 90.0, 90.0, "Moving", t0 + timedelta(seconds=i))
+    writer.start()
+    assert writer.flush(timeout=10)
+    writer.close()
+
+    with pg.cursor() as cur:
+        cur.execute("SELECT lon, count(*) FROM positions WHERE vehicle_id LIKE %s GROUP BY lon", (PREFIX + "%",))
+        counts = dict(cur.fetchall())
+    pg.rollback()
+    assert len(conns) == 2
+    assert sorted(counts.values()) == [1] * 9     # tiap titik tepat sekali
+    assert writer.rows_written == 9
+    assert writer.rejected == 1
+    assert writer.spool.pending == 0
@@ -0,0 +1,45 @@
+# tests/test_timeutil.py
+"""Semua pintu masuk waktu memakai konvensi yang sama untuk kolom ts (lokal naive)."""
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from timeutil import to_local_naive
+
+UTC_ISO = "2026-01-01T00:00:00+00:00"
+WIB = datetime(2026, 1, 1, 7, 0)   # UTC+7, tanpa DST
+
+
+@pytest.fixture
+def jakarta(monkeypatch):
+    if not hasattr(time, "tzset"):
+        pytest.skip("butuh time.tzset")
+    monkeypatch.setenv("TZ", "Asia/Jakarta")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_entry_points_agree(jakarta):
+    from dead_reckoning import parse_at
+
+    aware = datetime.fromisoformat(UTC_ISO)
+    assert to_local_naive(aware) == WIB
+    assert to_local_naive(WIB) is WIB
+    assert to_local_naive(None) is None
+    assert parse_at(UTC_ISO) == WIB
+    assert parse_at("2026-01-01T07:00:00") == WIB
+
+
+def test_gateway_and_memory_use_same_convention(jakarta):
+    ingest_gateway = pytest.importorskip("ingest_gateway")
+    app_memory = pytest.importorskip("app_memory")
+
+    now = datetime.now()
+    assert ingest_gateway._ts(UTC_ISO, now) == WIB
+    assert ingest_gateway._ts(str(datetime.fromisoformat(UTC_ISO).timestamp()), now) == WIB
+    assert app_memory._local_naive(datetime.fromisoformat(UTC_ISO)) == WIB
+    assert abs(app_memory._local_naive(None) - datetime.now()) < timedelta(seconds=5)
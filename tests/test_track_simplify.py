@@ -0,0 +1,47 @@
+# tests/test_track_simplify.py
+import math
+import time
+
+from track_simplify import dp_importance, simplify_to_count, thin
+
+
+def _parked(n):
+    return [{"lat": -6.2, "lon": 106.8} for _ in range(n)]
+
+
+def _straight(n):
+    return [{"lat": -6.2 + i * 1e-5, "lon": 106.8 + i * 1e-5} for i in range(n)]
+
+
+def test_degenerate_tracks_are_not_quadratic():
+    # sebelumnya ~5 detik untuk 8k titik berimpit (pemisah selalu di i + 1)
+    for points in (_parked(200_000), _straight(200_000)):
+        t0 = time.perf_counter()
+        imp = dp_importance(points)
+        assert time.perf_counter() - t0 < 5.0
+        assert imp[0] == imp[-1] == math.inf
+        assert max(imp[1:-1]) < 1e-3
+
+
+def test_simplify_bounds_dp_input():
+    points = _parked(200_000)
+    t0 = time.perf_counter()
+    out = simplify_to_count(points, 500, max_input=20_000)
+    assert time.perf_counter() - t0 < 2.0
+    assert len(out) == 500
+    assert out[0] is points[0] and out[-1] is points[-1]
+
+
+def test_simplify_keeps_corner():
+    # L-shape: titik sudut harus bertahan walau target hanya 3
+    points = [{"lat": 0.0, "lon": i * 0.01} for i in range(100)]
+    points += [{"lat": i * 0.01, "lon": 0.99} for i in range(1, 100)]
+    out = simplify_to_count(points, 3)
+    assert out == [points[0], points[99], points[-1]]
+
+
+def test_thin_keeps_endpoints():
+    points = list(range(1001))
+    out = thin(points, 11)
+    assert out == list(range(0, 1001, 100))
+    assert thin(points, 5000) == points
@@ -0,0 +1,160 @@
+# tests/test_weather_cache.py
+"""/get_full_weather_data terhadap stub upstream (benchmarks/stub_weather.py): coalescing, TTL, konkurensi."""
+import os
+import sys
+import time
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+from fastapi import FastAPI  # noqa: E402
+
+from conftest import ROOT  # noqa: E402
+
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from stub_weather import start_stub  # noqa: E402
+
+import app_sea  # noqa: E402
+from weather_cache import MemoryBackend, WeatherCache  # noqa: E402
+
+LATENCY = 0.2
+TIME = "2025-08-25T10:10:00"
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    def _start(ttl=1800.0, fail_rate=0.0):
+        server, state = start_stub(openweather_latency=LATENCY, stormglass_latency=LATENCY, fail_rate=fail_rate)
+        base = f"http://127.0.0.1:{server.server_port}"
+        monkeypatch.setattr(app_sea, "OPENWEATHER_URL", base + "/data/2.5/weather")
+        monkeypatch.setattr(app_sea, "STORMGLASS_URL", base + "/v2/weather/point")
+        monkeypatch.setattr(app_sea, "weather_cache", WeatherCache(MemoryBackend(), ttl=ttl, grid_deg=0.1))
+        monkeypatch.setattr(app_sea, "_http_client", None)  # client terikat event loop test sebelumnya
+        servers.append(server)
+        return state
+
+    servers = []
+    yield _start
+    for s in servers:
+        s.shutdown()
+        s.server_close()
+
+
+def _run(requests):
+    """Kirim semua (lat, lon, time) bersamaan ke router. Return (list respons, detik)."""
+    app = FastAPI()
+    app.include_router(app_sea.router)
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            t0 = time.perf_counter()
+            out = await asyncio.gather(*[
+                client.get("/get_full_weather_data", params={"lat": lat, "lon": lon, "time": t})
+                for lat, lon, t in requests
+            ])
+            elapsed = time.perf_counter() - t0
+        await app_sea.close_http_client()
+        return out, elapsed
+
+    return asyncio.run(main())
+
+
+def test_concurrent_misses_same_cell_coalesce(stub):
+    state = stub()
+    # semua titik jatuh di sel 0.1 derajat & jam yang sama
+    reqs = [(-6.2 + i * 0.001, 106.8 + i * 0.001, TIME) for i in range(20)]
+    resps, _ = _run(reqs)
+
+    assert [r.status_code for r in resps] == [200] * 20
+    assert state.calls == {"openweather": 1, "stormglass": 1}
+    stats = app_sea.weather_cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 19, 0)
+
+
+def test_distinct_cells_fetch_concurrently_then_hit(stub):
+    state = stub()
+    reqs = [(-6.2 + i, 106.8, TIME) for i in range(10)]
+    resps, elapsed = _run(reqs)
+
+    assert all(r.status_code == 200 for r in resps)
+    assert state.calls == {"openweather": 10, "stormglass": 10}
+    # 10 sel x 2 upstream dengan latency LATENCY: serial ~4 detik, bersamaan ~LATENCY
+    assert elapsed < LATENCY * 5
+
+    resps, _ = _run(reqs)
+    assert all(r.status_code == 200 for r in resps)
+    assert state.calls == {"openweather": 10, "stormglass": 10}
+    stats = app_sea.weather_cache.stats()
+    assert (stats["misses"], stats["hits"]) == (10, 10)
+
+
+def test_ttl_expiry_refetches(stub):
+    state = stub(ttl=0.3)
+    reqs = [(-6.2, 106.8, TIME)]
+    _run(reqs)
+    _run(reqs)
+    assert state.calls["openweather"] == 1
+
+    time.sleep(0.4)
+    _run(reqs)
+    assert state.calls["openweather"] == 2
+    stats = app_sea.weather_cache.stats()
+    assert (stats["misses"], stats["hits"]) == (2, 1)
+
+
+def test_upstream_error_is_not_cached(stub):
+    state = stub(fail_rate=1.0)
+    reqs = [(-6.2, 106.8, TIME)] * 5
+    resps, _ = _run(reqs)
+
+    assert [r.status_code for r in resps] == [500] * 5
+    assert state.calls["openweather"] == 1      # kegagalan pun di-coalesce
+    assert app_sea.weather_cache.stats()["errors"] == 1
+
+    _run(reqs[:1])
+    assert state.calls["openweather"] == 2      # error tidak di-cache
+    assert app_sea.weather_cache.stats()["entries"] == 0
+
+
+def test_sqlite_lock_does_not_block_event_loop(tmp_path):
+    import sqlite3
+    import threading
+
+    from weather_cache import SqliteBackend, cell_key
+
+    path = str(tmp_path / "weather.sqlite3")
+    cache = WeatherCache(SqliteBackend(path), ttl=60)
+    cell = cache.cell(-6.2, 106.8, TIME)
+    cache.backend.set(cell_key(cell), {"t": 1}, 60)
+
+    # worker lain memegang write lock SQLite selama ~0.5 detik
+    other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.5, other.commit).start()
+
+    async def fetch(*cell):
+        raise AssertionError("harus hit")
+
+    async def main():
+        lag, stop = [], asyncio.Event()
+
+        async def ticker():
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lag.append(time.perf_counter() - t0)
+
+        tick = asyncio.ensure_future(ticker())
+        t0 = time.perf_counter()
+        value = await cache.get_or_fetch(cell, fetch)
+        waited = time.perf_counter() - t0
+        stop.set()
+        await tick
+        return value, waited, max(lag, default=waited)   # kosong = loop tidak sempat jalan
+
+    value, waited, max_lag = asyncio.run(main())
+    other.close()
+    assert value == {"t": 1}
+    assert waited >= 0.4          # get benar-benar menunggu lock...
+    assert max_lag < 0.2          # ...tapi event loop tetap jalan